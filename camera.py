@@ -17,7 +17,7 @@ import os
 import logging
 import subprocess
 from datetime import datetime
-from threading import Thread, Event
+from threading import Thread, Event, Condition
 import numpy as np
 import picamera
 from picamera import PiCamera
@@ -43,6 +43,7 @@ class Camera:
         # Camera variables
         self.camera = None
         self.frame = None
+        self.frame_jpeg = None  # JPEG bytes from the hardware encoder for the current frame
         self.running = False
         self.recording = False
         self.current_video_path = None
@@ -56,6 +57,7 @@ class Camera:
         # Thread-related
         self.capture_thread = None
         self.stop_event = Event()
+        self.frame_cond = Condition()  # Notified when a new frame is captured
         
         # Initialize storage directories
         self._init_directories()
@@ -136,13 +138,18 @@ class Camera:
                 # Reset stream position
                 stream.seek(0)
                 
-                # Convert to numpy array
-                data = np.frombuffer(stream.getvalue(), dtype=np.uint8)
+                # Keep the hardware-encoded JPEG, then convert to numpy array
+                self.frame_jpeg = stream.getvalue()
+                data = np.frombuffer(self.frame_jpeg, dtype=np.uint8)
                 self.frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
                 
                 # Add timestamp and other info to frame
                 self._add_overlay_info(self.frame)
                 
+                # Wake up threads waiting for a new frame
+                with self.frame_cond:
+                    self.frame_cond.notify_all()
+                
                 # Reset stream for next capture
                 stream.seek(0)
                 stream.truncate()
@@ -38,6 +38,7 @@ DUAL_FISHEYE_CONFIG = {
     'photo_extension': '.jpg',        # 写真ファイル拡張子
     'preview_width': 1024,            # プレビュー幅
     'preview_height': 512,            # プレビュー高さ
+    'preview_hw_jpeg': False,         # フィッシュアイ表示時はカメラのハードウェアJPEGをそのまま配信（CPUエンコードなし、オーバーレイなし）
     'display_mode': 'equirectangular', # 初期表示モード: 'fisheye', 'equirectangular'
     'delete_h264_after_conversion': True,  # 変換後h264ファイルを削除
     'window_title': '360cam GNSS - Dual Fisheye',  # ウィンドウタイトル
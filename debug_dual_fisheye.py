@@ -146,9 +146,9 @@ class DebugDualFisheyeCamera(Camera):
         equ_h = int(height * self.config.get('equ_height_ratio', 0.5))
         equ_w = width
         
-        # Create empty maps for x and y coordinate mappings
-        self.fisheye_xmap = np.zeros((equ_h, equ_w), np.float32)
-        self.fisheye_ymap = np.zeros((equ_h, equ_w), np.float32)
+        # Allocate maps for x and y coordinate mappings (every element is written below)
+        self.fisheye_xmap = np.empty((equ_h, equ_w), np.float32)
+        self.fisheye_ymap = np.empty((equ_h, equ_w), np.float32)
         
         # Calculate center point for each fisheye lens
         cx1 = self.config.get('cx1')  # Left fisheye center x
@@ -166,44 +166,39 @@ class DebugDualFisheyeCamera(Camera):
         
         # Calculate maximum theta angle based on field of view
         max_theta = fov / 2
+        scale_factor = max_theta / (np.pi/2)  # Adjust scaling for FOV
+        
+        # Bind loop invariants to locals to avoid repeated lookups per pixel
+        xmap = self.fisheye_xmap
+        ymap = self.fisheye_ymap
         
         # Create maps with simplified approach
         for y in range(equ_h):
+            # Values that only depend on the row
+            phi = (y / equ_h) * np.pi                # 0 to pi
+            sin_phi = np.sin(phi)
+            z3d = np.cos(phi)
+            
             for x in range(equ_w):
                 # Convert equirectangular coordinates to spherical
                 theta = (x / equ_w) * 2 * np.pi - np.pi  # -pi to pi
-                phi = (y / equ_h) * np.pi                # 0 to pi
                 
                 # Convert spherical to 3D Cartesian
-                x3d = np.sin(phi) * np.cos(theta)
-                y3d = np.sin(phi) * np.sin(theta)
-                z3d = np.cos(phi)
+                x3d = sin_phi * np.cos(theta)
+                y3d = sin_phi * np.sin(theta)
+                
+                # Calculate fisheye projection parameters, scaled for field of view
+                r = radius * np.sqrt(x3d*x3d + z3d*z3d) / (y3d + 1e-6)
+                r = r / scale_factor
+                angle = np.arctan2(z3d, x3d)
                 
                 # Simplified approach: use left half for left hemisphere, right half for right hemisphere
                 if theta < 0:  # Left hemisphere
-                    # Calculate fisheye projection parameters
-                    r = radius * np.sqrt(x3d*x3d + z3d*z3d) / (y3d + 1e-6)
-                    angle = np.arctan2(z3d, x3d)
-                    
-                    # Scale for field of view
-                    scale_factor = max_theta / (np.pi/2)  # Adjust scaling for FOV
-                    r = r / scale_factor
-                    
-                    # Map to coordinates
-                    self.fisheye_xmap[y, x] = cx1 + r * np.cos(angle)
-                    self.fisheye_ymap[y, x] = cy1 + r * np.sin(angle)
+                    xmap[y, x] = cx1 + r * np.cos(angle)
+                    ymap[y, x] = cy1 + r * np.sin(angle)
                 else:  # Right hemisphere
-                    # Calculate fisheye projection parameters
-                    r = radius * np.sqrt(x3d*x3d + z3d*z3d) / (y3d + 1e-6)
-                    angle = np.arctan2(z3d, x3d)
-                    
-                    # Scale for field of view
-                    scale_factor = max_theta / (np.pi/2)
-                    r = r / scale_factor
-                    
-                    # Map to coordinates
-                    self.fisheye_xmap[y, x] = cx2 + r * np.cos(angle)
-                    self.fisheye_ymap[y, x] = cy2 + r * np.sin(angle)
+                    xmap[y, x] = cx2 + r * np.cos(angle)
+                    ymap[y, x] = cy2 + r * np.sin(angle)
         
         # Convert maps to correct format for remap
         self.fisheye_xmap = self.fisheye_xmap.astype(np.float32)
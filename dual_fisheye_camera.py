@@ -80,9 +80,9 @@ class DualFisheyeCamera(Camera):
         equ_h = int(height * self.config.get('equ_height_ratio', 0.5))
         equ_w = width
         
-        # Create empty maps for x and y coordinate mappings
-        self.fisheye_xmap = np.zeros((equ_h, equ_w), np.float32)
-        self.fisheye_ymap = np.zeros((equ_h, equ_w), np.float32)
+        # Allocate maps for x and y coordinate mappings (every element is written below)
+        self.fisheye_xmap = np.empty((equ_h, equ_w), np.float32)
+        self.fisheye_ymap = np.empty((equ_h, equ_w), np.float32)
         
         # Calculate center point for each fisheye lens
         cx1 = self.config.get('cx1')  # Left fisheye center x
@@ -100,88 +100,60 @@ class DualFisheyeCamera(Camera):
         
         # Calculate maximum theta angle based on field of view
         max_theta = fov / 2
+        scale_factor = max_theta / (np.pi/2)  # Adjust scaling for FOV
         
         # Flag for 180° opposite direction camera setup
         back_to_back = self.config.get('back_to_back', True)
         
+        # Bind loop invariants to locals to avoid repeated lookups per pixel
+        xmap = self.fisheye_xmap
+        ymap = self.fisheye_ymap
+        half_pi = np.pi / 2
+        
         # Create maps for back-to-back camera setup
         for y in range(equ_h):
+            # Values that only depend on the row
+            phi = (y / equ_h) * np.pi                # 0 to pi
+            sin_phi = np.sin(phi)
+            z3d = np.cos(phi)
+            
             for x in range(equ_w):
                 # Convert equirectangular coordinates to spherical
                 theta = (x / equ_w) * 2 * np.pi - np.pi  # -pi to pi
-                phi = (y / equ_h) * np.pi                # 0 to pi
-                
-                # Convert spherical to 3D Cartesian
-                x3d = np.sin(phi) * np.cos(theta)
-                y3d = np.sin(phi) * np.sin(theta)
-                z3d = np.cos(phi)
                 
                 # Back-to-back cameras (opposite directions)
                 if back_to_back:
                     # Use the appropriate fisheye lens based on the horizontal angle (theta)
                     # Front hemisphere: -π/2 to π/2
                     # Rear hemisphere: π/2 to 3π/2 (or -3π/2 to -π/2)
-                    if -np.pi/2 <= theta <= np.pi/2:
+                    if -half_pi <= theta <= half_pi:
                         # Front fisheye (first camera)
-                        # Project 3D point to fisheye image
-                        r = radius * np.sqrt(x3d*x3d + z3d*z3d) / (y3d + 1e-6)
-                        angle = np.arctan2(z3d, x3d)
-                        
-                        # Scale for field of view
-                        scale_factor = max_theta / (np.pi/2)  # Adjust scaling for FOV
-                        r = r / scale_factor
-                        
-                        # Map to image coordinates
-                        self.fisheye_xmap[y, x] = cx1 + r * np.cos(angle)
-                        self.fisheye_ymap[y, x] = cy1 + r * np.sin(angle)
+                        cx, cy = cx1, cy1
                     else:
                         # Rear fisheye (second camera)
                         # For back-to-back cameras, we need to flip the direction
                         # Since the second camera is facing the opposite direction
-                        theta_adjusted = theta - np.pi if theta > 0 else theta + np.pi
-                        
-                        # Recalculate 3D position for the rear camera
-                        x3d_rear = np.sin(phi) * np.cos(theta_adjusted)
-                        y3d_rear = np.sin(phi) * np.sin(theta_adjusted)
-                        z3d_rear = np.cos(phi)
-                        
-                        # Project to fisheye coordinates
-                        r = radius * np.sqrt(x3d_rear*x3d_rear + z3d_rear*z3d_rear) / (y3d_rear + 1e-6)
-                        angle = np.arctan2(z3d_rear, x3d_rear)
-                        
-                        # Scale for field of view
-                        scale_factor = max_theta / (np.pi/2)
-                        r = r / scale_factor
-                        
-                        # Map to image coordinates (second camera)
-                        self.fisheye_xmap[y, x] = cx2 + r * np.cos(angle)
-                        self.fisheye_ymap[y, x] = cy2 + r * np.sin(angle)
+                        theta = theta - np.pi if theta > 0 else theta + np.pi
+                        cx, cy = cx2, cy2
                 else:
                     # Original approach for side-by-side (not back-to-back) cameras
                     if theta < 0:  # Left hemisphere
-                        # Calculate fisheye projection parameters
-                        r = radius * np.sqrt(x3d*x3d + z3d*z3d) / (y3d + 1e-6)
-                        angle = np.arctan2(z3d, x3d)
-                        
-                        # Scale for field of view
-                        scale_factor = max_theta / (np.pi/2)  # Adjust scaling for FOV
-                        r = r / scale_factor
-                        
-                        # Map to coordinates
-                        self.fisheye_xmap[y, x] = cx1 + r * np.cos(angle)
-                        self.fisheye_ymap[y, x] = cy1 + r * np.sin(angle)
+                        cx, cy = cx1, cy1
                     else:  # Right hemisphere
-                        # Calculate fisheye projection parameters
-                        r = radius * np.sqrt(x3d*x3d + z3d*z3d) / (y3d + 1e-6)
-                        angle = np.arctan2(z3d, x3d)
-                        
-                        # Scale for field of view
-                        scale_factor = max_theta / (np.pi/2)
-                        r = r / scale_factor
-                        
-                        # Map to coordinates
-                        self.fisheye_xmap[y, x] = cx2 + r * np.cos(angle)
-                        self.fisheye_ymap[y, x] = cy2 + r * np.sin(angle)
+                        cx, cy = cx2, cy2
+                
+                # Convert spherical to 3D Cartesian
+                x3d = sin_phi * np.cos(theta)
+                y3d = sin_phi * np.sin(theta)
+                
+                # Project 3D point to fisheye image, scaled for field of view
+                r = radius * np.sqrt(x3d*x3d + z3d*z3d) / (y3d + 1e-6)
+                r = r / scale_factor
+                angle = np.arctan2(z3d, x3d)
+                
+                # Map to image coordinates
+                xmap[y, x] = cx + r * np.cos(angle)
+                ymap[y, x] = cy + r * np.sin(angle)
         
         # Optionally apply smoothing to the transition regions
         if self.config.get('smooth_transition', True) and back_to_back:
@@ -223,6 +195,8 @@ class DualFisheyeCamera(Camera):
     def stop(self):
         """Stop camera capture - override parent method"""
         self.stop_event.set()
+        with self.frame_cond:
+            self.frame_cond.notify_all()
         
         if self.process_thread:
             self.process_thread.join(timeout=3.0)
@@ -241,8 +215,9 @@ class DualFisheyeCamera(Camera):
                     # Apply equirectangular conversion
                     self.equirectangular_frame = self._convert_to_equirectangular(self.frame)
                 
-                # Small delay to match framerate
-                time.sleep(0.01)
+                # Wait for the capture loop to deliver the next frame
+                with self.frame_cond:
+                    self.frame_cond.wait(timeout=0.5)
         
         except Exception as e:
             self.logger.error(f"Process loop error: {str(e)}")
@@ -266,23 +241,39 @@ class DualFisheyeCamera(Camera):
             self.logger.error(f"Equirectangular conversion error: {str(e)}")
             return frame
     
-    def get_preview_frame(self):
-        """Get a frame for preview - override parent method"""
+    def get_preview_frame(self, size=None):
+        """Get a frame for preview - override parent method
+        
+        size: (width, height) of the preview, defaults to the configured preview size
+        """
         if self.display_mode == 'equirectangular' and self.equirectangular_frame is not None:
             frame = self.equirectangular_frame
         else:
-            # Use parent class method to get frame
-            frame = super().get_preview_frame()
+            # Raw dual fisheye frame (no display mode transform applies)
+            frame = self.frame
         
         if frame is None:
             return None
+        
+        if size is None:
+            size = (self.config['preview_width'], self.config['preview_height'])
             
         try:
-            # Resize if needed
-            if self.config['preview_width'] > 0 and self.config['preview_height'] > 0:
-                frame = cv2.resize(frame, (self.config['preview_width'], self.config['preview_height']))
-                
-            return frame
+            # The result is always a new array: callers hand it to other threads
+            frame_h, frame_w = frame.shape[:2]
+            width, height = size
+            if width <= 0 or height <= 0 or (frame_w, frame_h) == (width, height):
+                # Copy so the caller never shares the camera's buffer
+                return frame.copy()
+            
+            step_y, step_x = frame_h // height, frame_w // width
+            if step_x and step_y and (step_x * width, step_y * height) == (frame_w, frame_h):
+                # Integer multiple of the preview size: take every n-th pixel
+                # instead of running the resize kernel
+                return np.ascontiguousarray(frame[::step_y, ::step_x])
+            
+            # Resize straight to the requested size in one pass
+            return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA)
         except Exception as e:
             self.logger.error(f"Preview frame error: {str(e)}")
             return None
@@ -24,6 +24,9 @@ import queue
 
 from config import GNSS_CONFIG, STORAGE_CONFIG, APP_CONFIG
 
+# NMEA sentence types that are actually consumed by _process_loop
+PARSED_SENTENCE_TYPES = ('GGA', 'RMC', 'GSA')
+
 class GNSS:
     """Class for processing GNSS data and saving in GPX and NMEA formats"""
     
@@ -268,50 +271,53 @@ class GNSS:
                     except Exception as e:
                         self.logger.error(f"NMEA write error: {str(e)}")
                 
-                # Parse NMEA sentence
-                try:
-                    msg = pynmea2.parse(line)
-                    
-                    # Store specific message types
-                    if isinstance(msg, pynmea2.GGA):
-                        self.last_gga = msg
+                # Only parse sentence types we use (skip GSV, VTG, ...) to
+                # avoid paying for a full pynmea2 parse on every line
+                if line[3:6] in PARSED_SENTENCE_TYPES:
+                    # Parse NMEA sentence
+                    try:
+                        msg = pynmea2.parse(line)
                         
-                        # Update position if valid
-                        if msg.latitude and msg.longitude:
-                            # Create GPX point
-                            point = gpxpy.gpx.GPXTrackPoint(
-                                latitude=msg.latitude,
-                                longitude=msg.longitude,
-                                elevation=msg.altitude,
-                                time=datetime.combine(
-                                    datetime.now().date(),
-                                    datetime.strptime(msg.timestamp.strftime('%H%M%S.%f'), '%H%M%S.%f').time()
-                                )
-                            )
-                            
-                            # Add to track
-                            self.gpx_segment.points.append(point)
+                        # Store specific message types
+                        if isinstance(msg, pynmea2.GGA):
+                            self.last_gga = msg
                             
-                            # Update current position
-                            self.current_position = (msg.latitude, msg.longitude, msg.altitude)
-                            
-                            # Notify sync manager if PPS is enabled
-                            if self.sync_manager and self.app_config['enable_pps_sync']:
-                                self.sync_manager.register_gnss_update(
-                                    position=self.current_position,
-                                    timestamp=timestamp
+                            # Update position if valid
+                            if msg.latitude and msg.longitude:
+                                # Create GPX point
+                                point = gpxpy.gpx.GPXTrackPoint(
+                                    latitude=msg.latitude,
+                                    longitude=msg.longitude,
+                                    elevation=msg.altitude,
+                                    time=datetime.combine(
+                                        datetime.now().date(),
+                                        msg.timestamp.replace(tzinfo=None)
+                                    )
                                 )
+                                
+                                # Add to track
+                                self.gpx_segment.points.append(point)
+                                
+                                # Update current position
+                                self.current_position = (msg.latitude, msg.longitude, msg.altitude)
+                                
+                                # Notify sync manager if PPS is enabled
+                                if self.sync_manager and self.app_config['enable_pps_sync']:
+                                    self.sync_manager.register_gnss_update(
+                                        position=self.current_position,
+                                        timestamp=timestamp
+                                    )
+                        
+                        elif isinstance(msg, pynmea2.RMC):
+                            self.last_rmc = msg
+                            self.current_time = msg.datetime
+                        
+                        elif isinstance(msg, pynmea2.GSA):
+                            self.last_gsa = msg
                     
-                    elif isinstance(msg, pynmea2.RMC):
-                        self.last_rmc = msg
-                        self.current_time = msg.datetime
-                    
-                    elif isinstance(msg, pynmea2.GSA):
-                        self.last_gsa = msg
-                
-                except Exception as e:
-                    # Not all lines are valid NMEA sentences
-                    pass
+                    except Exception as e:
+                        # Not all lines are valid NMEA sentences
+                        pass
                 
                 # Periodically save GPX file
                 current_time = time.time()
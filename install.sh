@@ -19,8 +19,13 @@ sudo apt-get install -y \
     libatlas-base-dev \
     libopenjp2-7 \
     libtiff5 \
+    libjpeg62-turbo \
     gpac  # Provides MP4Box for video conversion
 
+# OpenCV should use libjpeg-turbo for fast preview JPEG encoding
+# ("libjpeg.so (ver 62)" is libjpeg62-turbo; "ver 90" means the slower libjpeg9)
+python3 -c "import cv2; print(cv2.getBuildInformation())" | grep -i "jpeg:"
+
 # Install Python dependencies
 pip3 install pynmea2 gpxpy pyserial picamera
 
@@ -15,9 +15,10 @@ import os
 import time
 import json
 import logging
+import numpy as np
 import RPi.GPIO as GPIO
 from datetime import datetime
-from threading import Thread, Event, Lock
+from threading import Thread, Event
 import queue
 
 from config import GNSS_CONFIG, STORAGE_CONFIG, APP_CONFIG
@@ -35,9 +36,14 @@ class SyncManager:
         # PPS and synchronization variables
         self.pps_pin = self.config['pps_gpio_pin']
         self.pps_count = 0
-        self.last_pps_time = None
-        self.pps_timestamps = []
-        self.max_pps_history = 100  # Store last 100 PPS events
+        self.max_pps_history = 100  # Store last 100 PPS events (must cover one save interval)
+        
+        # PPS edge times (ns since epoch) in a preallocated ring buffer;
+        # event dicts are only built when sync data is saved
+        self._pps_ring = np.empty(self.max_pps_history, dtype=np.int64)
+        self._pps_saved_count = 0
+        self._last_pps_cache = (0, None)
+        self.gnss_event_count = 0
         
         # Synchronization data
         self.sync_data = {
@@ -48,11 +54,22 @@ class SyncManager:
         }
         self.current_sync_path = None
         
+        # Sync file location settings, resolved once
+        self._sync_parent = os.path.join(
+            self.storage_config['base_path'],
+            self.storage_config['sync_dir']
+        )
+        self._ts_fmt = self.storage_config['timestamp_format']
+        self._use_subdir = self.storage_config['use_timestamp_subdir']
+        
+        # Events are queued by producers (PPS callback, camera, GNSS) and
+        # drained into sync_data by the PPS thread before each save
+        self._event_q = queue.SimpleQueue()
+        
         # Thread-related
         self.running = False
         self.pps_thread = None
         self.stop_event = Event()
-        self.lock = Lock()
         
         # Initialize GPIO
         self._setup_gpio()
@@ -62,12 +79,7 @@ class SyncManager:
     
     def _init_directories(self):
         """Initialize storage directories"""
-        base_path = self.storage_config['base_path']
-        sync_dir = os.path.join(base_path, self.storage_config['sync_dir'])
-        
-        if not os.path.exists(sync_dir):
-            os.makedirs(sync_dir)
-            self.logger.info(f"Created directory: {sync_dir}")
+        os.makedirs(self._sync_parent, exist_ok=True)
     
     def _setup_gpio(self):
         """Setup GPIO for PPS signal"""
@@ -119,28 +131,49 @@ class SyncManager:
     
     def _init_sync_file(self):
         """Initialize synchronization file"""
-        timestamp = datetime.now().strftime(self.storage_config['timestamp_format'])
+        now = datetime.now()
         
-        if self.storage_config['use_timestamp_subdir']:
-            subdir = datetime.now().strftime("%Y%m%d")
-            sync_dir = os.path.join(
-                self.storage_config['base_path'],
-                self.storage_config['sync_dir'],
-                subdir
-            )
-            if not os.path.exists(sync_dir):
-                os.makedirs(sync_dir)
-        else:
-            sync_dir = os.path.join(
-                self.storage_config['base_path'],
-                self.storage_config['sync_dir']
-            )
+        sync_dir = self._sync_parent
+        if self._use_subdir:
+            sync_dir = os.path.join(sync_dir, now.strftime("%Y%m%d"))
+            os.makedirs(sync_dir, exist_ok=True)
         
-        self.current_sync_path = os.path.join(sync_dir, f"sync_{timestamp}.json")
+        self.current_sync_path = os.path.join(sync_dir, f"sync_{now.strftime(self._ts_fmt)}.json")
         self.logger.info(f"Initialized sync file: {self.current_sync_path}")
     
+    def _drain_events(self):
+        """Move queued events into sync_data"""
+        while True:
+            try:
+                category, event = self._event_q.get_nowait()
+            except queue.Empty:
+                break
+            self.sync_data[category].append(event)
+    
+    def _pps_time(self, count):
+        """Get the datetime of PPS edge number count (1-based) from the ring"""
+        ns = int(self._pps_ring[(count - 1) % self.max_pps_history])
+        return datetime.fromtimestamp(ns / 1e9)
+    
+    def _materialize_pps_events(self):
+        """Append PPS edges recorded since the last save to sync_data"""
+        pps_count = self.pps_count
+        start = max(self._pps_saved_count, pps_count - self.max_pps_history)
+        
+        if start > self._pps_saved_count:
+            self.logger.warning(f"Dropped {start - self._pps_saved_count} PPS events from history")
+        
+        self.sync_data['pps_events'].extend(
+            {'count': count, 'time': self._pps_time(count)}
+            for count in range(start + 1, pps_count + 1)
+        )
+        self._pps_saved_count = pps_count
+    
     def _save_sync_data(self):
         """Save synchronization data to file"""
+        self._drain_events()
+        self._materialize_pps_events()
+        
         if self.current_sync_path:
             try:
                 with open(self.current_sync_path, 'w') as sync_file:
@@ -151,8 +184,8 @@ class SyncManager:
     
     def _pps_loop(self):
         """PPS monitoring loop"""
-        last_save_time = time.time()
-        
+        save_interval = 60  # Save every minute
+
         try:
             # Setup edge detection callback
             GPIO.add_event_detect(
@@ -162,15 +195,13 @@ class SyncManager:
                 bouncetime=10
             )
             
-            # Main loop to periodically save data and keep thread running
-            while not self.stop_event.is_set():
-                time.sleep(0.1)
-                
-                # Periodically save sync data
-                current_time = time.time()
-                if current_time - last_save_time > 60:  # Save every minute
-                    self._save_sync_data()
-                    last_save_time = current_time
+            # Main loop to periodically save data and keep thread running.
+            # Sleep on the stop event so the thread only wakes when a save is
+            # due or a stop is requested.
+            deadline = time.monotonic() + save_interval
+            while not self.stop_event.wait(timeout=max(0.001, deadline - time.monotonic())):
+                self._save_sync_data()
+                deadline = time.monotonic() + save_interval
         
         except Exception as e:
             self.logger.error(f"PPS loop error: {str(e)}")
@@ -182,87 +213,82 @@ class SyncManager:
     
     def _pps_callback(self, channel):
         """Callback for PPS signal detection"""
-        timestamp = datetime.now()
+        # Only this callback writes the ring and the counter. The slot is
+        # filled before the count is bumped so readers never see an empty slot.
+        self._pps_ring[self.pps_count % self.max_pps_history] = time.time_ns()
+        self.pps_count += 1
         
-        with self.lock:
-            self.pps_count += 1
-            self.last_pps_time = timestamp
-            
-            # Add to history, maintaining maximum size
-            self.pps_timestamps.append(timestamp)
-            if len(self.pps_timestamps) > self.max_pps_history:
-                self.pps_timestamps.pop(0)
-            
-            # Record PPS event
-            pps_event = {
-                'count': self.pps_count,
-                'time': timestamp
-            }
-            self.sync_data['pps_events'].append(pps_event)
-            
-            # Log every 10th PPS event to reduce log volume
-            if self.pps_count % 10 == 0:
-                self.logger.debug(f"PPS signal #{self.pps_count} detected at {timestamp}")
+        # Log every 10th PPS event to reduce log volume
+        if self.pps_count % 10 == 0 and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("PPS signal #%d detected at %s", self.pps_count, self._pps_time(self.pps_count))
     
     def get_last_pps_time(self):
         """Get the timestamp of the last PPS signal"""
-        with self.lock:
-            return self.last_pps_time
+        pps_count = self.pps_count
+        if pps_count == 0:
+            return None
+        
+        # Convert once per PPS edge, not once per caller
+        cached_count, cached_time = self._last_pps_cache
+        if cached_count != pps_count:
+            cached_time = self._pps_time(pps_count)
+            self._last_pps_cache = (pps_count, cached_time)
+        return cached_time
     
     def get_pps_count(self):
         """Get the count of PPS signals"""
-        with self.lock:
-            return self.pps_count
+        return self.pps_count
     
     def register_recording_start(self, video_path, timestamp):
         """Register the start of a video recording"""
-        with self.lock:
-            recording = {
-                'event': 'start',
-                'path': video_path,
-                'time': timestamp,
-                'pps_count': self.pps_count,
-                'pps_time': self.last_pps_time
-            }
-            self.sync_data['recordings'].append(recording)
-            self.logger.info(f"Registered recording start at PPS #{self.pps_count}")
+        pps_count = self.pps_count
+        recording = {
+            'event': 'start',
+            'path': video_path,
+            'time': timestamp,
+            'pps_count': pps_count,
+            'pps_time': self._pps_time(pps_count) if pps_count else None
+        }
+        self._event_q.put(('recordings', recording))
+        self.logger.info(f"Registered recording start at PPS #{pps_count}")
     
     def register_recording_stop(self, video_path, timestamp):
         """Register the end of a video recording"""
-        with self.lock:
-            recording = {
-                'event': 'stop',
-                'path': video_path,
-                'time': timestamp,
-                'pps_count': self.pps_count,
-                'pps_time': self.last_pps_time
-            }
-            self.sync_data['recordings'].append(recording)
-            self.logger.info(f"Registered recording stop at PPS #{self.pps_count}")
+        pps_count = self.pps_count
+        recording = {
+            'event': 'stop',
+            'path': video_path,
+            'time': timestamp,
+            'pps_count': pps_count,
+            'pps_time': self._pps_time(pps_count) if pps_count else None
+        }
+        self._event_q.put(('recordings', recording))
+        self.logger.info(f"Registered recording stop at PPS #{pps_count}")
     
     def register_photo_capture(self, photo_path, timestamp):
         """Register a photo capture"""
-        with self.lock:
-            photo = {
-                'path': photo_path,
-                'time': timestamp,
-                'pps_count': self.pps_count,
-                'pps_time': self.last_pps_time
-            }
-            self.sync_data['photos'].append(photo)
-            self.logger.info(f"Registered photo capture at PPS #{self.pps_count}")
+        pps_count = self.pps_count
+        photo = {
+            'path': photo_path,
+            'time': timestamp,
+            'pps_count': pps_count,
+            'pps_time': self._pps_time(pps_count) if pps_count else None
+        }
+        self._event_q.put(('photos', photo))
+        self.logger.info(f"Registered photo capture at PPS #{pps_count}")
     
     def register_gnss_update(self, position, timestamp):
         """Register a significant GNSS update"""
-        with self.lock:
-            gnss_event = {
-                'position': position,
-                'time': timestamp,
-                'pps_count': self.pps_count,
-                'pps_time': self.last_pps_time
-            }
-            self.sync_data['gnss_events'].append(gnss_event)
-            
-            # Log every 10th GNSS event to reduce log volume
-            if len(self.sync_data['gnss_events']) % 10 == 0:
-                self.logger.debug(f"Registered GNSS update at PPS #{self.pps_count}")
+        pps_count = self.pps_count
+        gnss_event = {
+            'position': position,
+            'time': timestamp,
+            'pps_count': pps_count,
+            'pps_time': self._pps_time(pps_count) if pps_count else None
+        }
+        self._event_q.put(('gnss_events', gnss_event))
+        self.gnss_event_count += 1
+        
+        # Log every 10th GNSS event to reduce log volume
+        if self.gnss_event_count % 10 == 0 and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Registered GNSS update at PPS #%d", pps_count)
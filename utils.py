@@ -12,8 +12,8 @@
 #
 
 import os
+import re
 import logging
-import subprocess
 import time
 from datetime import datetime
 import shutil
@@ -21,14 +21,47 @@ import json
 
 from config import STORAGE_CONFIG, APP_CONFIG
 
-def setup_logging():
-    """Setup logging configuration"""
-    log_level = getattr(logging, APP_CONFIG['log_level'])
+# psutil is optional; without it system info falls back to /proc and stdlib calls
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+def _read_cpu_times():
+    """Read (busy, total) CPU jiffies from /proc/stat, or None if unavailable"""
+    try:
+        with open('/proc/stat', 'r') as f:
+            times = [int(value) for value in f.readline().split()[1:]]
+        idle = times[3] + (times[4] if len(times) > 4 else 0)  # idle + iowait
+        total = sum(times[:8])  # guest time is already counted in user/nice
+        return total - idle, total
+    except Exception:
+        return None
+
+# CPU usage is reported as the busy percentage since the previous call, so take
+# the first sample at import; otherwise the first report is always 0.0
+if psutil is not None:
+    psutil.cpu_percent(interval=None)
+    _last_cpu_times = None
+else:
+    _last_cpu_times = _read_cpu_times()
+
+# Date-named data directories (YYYYMMDD)
+DATE_DIR_PATTERN = re.compile(r'^\d{8}$')
+
+def setup_logging(level=None):
+    """
+    Setup logging configuration
+    
+    Args:
+        level: Log level name (e.g. 'DEBUG'); defaults to APP_CONFIG['log_level']
+    """
+    level_name = level if level is not None else APP_CONFIG['log_level']
+    log_level = getattr(logging, level_name)
     
     # Create logs directory
     log_dir = os.path.join(STORAGE_CONFIG['base_path'], 'logs')
-    if not os.path.exists(log_dir):
-        os.makedirs(log_dir)
+    os.makedirs(log_dir, exist_ok=True)
     
     log_file = os.path.join(log_dir, f"360cam_gnss_{datetime.now().strftime('%Y%m%d')}.log")
     
@@ -43,7 +76,7 @@ def setup_logging():
     )
     
     logger = logging.getLogger(__name__)
-    logger.info(f"Logging initialized at level {APP_CONFIG['log_level']}")
+    logger.info(f"Logging initialized at level {level_name}")
     
     return logger
 
@@ -102,41 +135,69 @@ def get_system_info():
     except Exception as e:
         logger.warning(f"Could not read CPU temperature: {str(e)}")
     
-    # Get CPU usage
-    try:
-        cpu_usage = subprocess.check_output(['top', '-bn1']).decode('utf-8').split('\n')[2]
-        cpu_usage = cpu_usage.split(',')[0].split(':')[1].strip()
-        info['cpu_usage'] = cpu_usage
-    except Exception as e:
-        logger.warning(f"Could not get CPU usage: {str(e)}")
-    
-    # Get memory info
-    try:
-        mem_info = subprocess.check_output(['free', '-m']).decode('utf-8').split('\n')[1].split()
-        info['mem_total'] = int(mem_info[1])
-        info['mem_used'] = int(mem_info[2])
-        info['mem_free'] = int(mem_info[3])
-    except Exception as e:
-        logger.warning(f"Could not get memory info: {str(e)}")
+    if psutil is not None:
+        _get_psutil_info(info, logger)
+    else:
+        _get_proc_info(info, logger)
     
     # Get disk space
     try:
-        disk_info = subprocess.check_output(['df', '-h', STORAGE_CONFIG['base_path']]).decode('utf-8').split('\n')[1].split()
-        info['disk_total'] = disk_info[1]
-        info['disk_used'] = disk_info[2]
-        info['disk_free'] = disk_info[3]
-        info['disk_usage_percent'] = disk_info[4]
+        disk = shutil.disk_usage(STORAGE_CONFIG['base_path'])
+        info['disk_total'] = disk.total >> 20
+        info['disk_used'] = disk.used >> 20
+        info['disk_free'] = disk.free >> 20
+        info['disk_usage_percent'] = round(disk.used * 100.0 / disk.total, 1)
     except Exception as e:
         logger.warning(f"Could not get disk info: {str(e)}")
     
     # Get kernel version
+    info['kernel'] = os.uname().release
+    
+    return info
+
+def _get_psutil_info(info, logger):
+    """Fill CPU and memory information using psutil"""
     try:
-        kernel = subprocess.check_output(['uname', '-r']).decode('utf-8').strip()
-        info['kernel'] = kernel
+        info['cpu_usage'] = psutil.cpu_percent(interval=None)
+        mem = psutil.virtual_memory()
+        info['mem_total'] = mem.total >> 20
+        info['mem_used'] = mem.used >> 20
+        info['mem_free'] = mem.available >> 20
     except Exception as e:
-        logger.warning(f"Could not get kernel version: {str(e)}")
+        logger.warning(f"Could not get CPU/memory info: {str(e)}")
+
+def _get_proc_info(info, logger):
+    """Fill CPU and memory information from /proc without spawning processes"""
+    global _last_cpu_times
     
-    return info
+    # Same meaning as psutil.cpu_percent: busy percentage since the previous call
+    cpu_times = _read_cpu_times()
+    if cpu_times is not None and _last_cpu_times is not None:
+        busy = cpu_times[0] - _last_cpu_times[0]
+        total = cpu_times[1] - _last_cpu_times[1]
+        info['cpu_usage'] = round(busy * 100.0 / total, 1) if total > 0 else 0.0
+    else:
+        logger.warning("Could not get CPU usage from /proc/stat")
+    _last_cpu_times = cpu_times
+    
+    try:
+        meminfo = {}
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                key, value = line.split(':', 1)
+                meminfo[key] = int(value.split()[0])  # kB
+        info['mem_total'] = meminfo['MemTotal'] >> 10
+        info['mem_free'] = meminfo.get('MemAvailable', meminfo['MemFree']) >> 10
+        info['mem_used'] = info['mem_total'] - info['mem_free']
+    except Exception as e:
+        logger.warning(f"Could not get memory info: {str(e)}")
+
+def get_free_space_mb(path=None):
+    """Get free space in MB available to unprivileged users on the storage filesystem"""
+    if path is None:
+        path = STORAGE_CONFIG['base_path']
+    stat = os.statvfs(path)
+    return (stat.f_bavail * stat.f_frsize) >> 20
 
 def check_storage_space():
     """Check available storage space and clean up if necessary"""
@@ -145,8 +206,7 @@ def check_storage_space():
     
     try:
         # Check available space
-        disk_info = subprocess.check_output(['df', '-m', STORAGE_CONFIG['base_path']]).decode('utf-8').split('\n')[1].split()
-        free_space_mb = int(disk_info[3])
+        free_space_mb = get_free_space_mb()
         
         logger.info(f"Available storage space: {free_space_mb}MB")
         
@@ -157,8 +217,7 @@ def check_storage_space():
             clean_old_data(min_free_space_mb)
             
             # Check again
-            disk_info = subprocess.check_output(['df', '-m', STORAGE_CONFIG['base_path']]).decode('utf-8').split('\n')[1].split()
-            free_space_mb = int(disk_info[3])
+            free_space_mb = get_free_space_mb()
             
             if free_space_mb < min_free_space_mb:
                 logger.error(f"Still low on storage space after cleanup: {free_space_mb}MB available")
@@ -175,22 +234,15 @@ def clean_old_data(min_free_space_mb):
     
     # Function to get directories sorted by date
     def get_date_sorted_dirs(parent_dir):
-        dirs = []
-        for item in os.listdir(parent_dir):
-            item_path = os.path.join(parent_dir, item)
-            if os.path.isdir(item_path):
-                try:
-                    # Try to parse folder name as date (YYYYMMDD format)
-                    datetime.strptime(item, "%Y%m%d")
-                    dirs.append(item_path)
-                except ValueError:
-                    pass
+        # scandir reports the entry type without a stat() per entry
+        with os.scandir(parent_dir) as it:
+            dirs = [entry.path for entry in it
+                    if entry.is_dir(follow_symlinks=False) and DATE_DIR_PATTERN.match(entry.name)]
         return sorted(dirs)
     
     # Check if we have enough space after each directory removal
     def check_space():
-        disk_info = subprocess.check_output(['df', '-m', STORAGE_CONFIG['base_path']]).decode('utf-8').split('\n')[1].split()
-        return int(disk_info[3]) >= min_free_space_mb
+        return get_free_space_mb() >= min_free_space_mb
     
     base_path = STORAGE_CONFIG['base_path']
     
@@ -232,9 +284,7 @@ def backup_config():
     try:
         config_path = "config.py"
         backup_dir = os.path.join(STORAGE_CONFIG['base_path'], 'backups')
-        
-        if not os.path.exists(backup_dir):
-            os.makedirs(backup_dir)
+        os.makedirs(backup_dir, exist_ok=True)
         
         # Create backup with timestamp
         timestamp = datetime.now().strftime(STORAGE_CONFIG['timestamp_format'])
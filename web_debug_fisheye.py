@@ -14,11 +14,13 @@
 import cv2
 import time
 import os
+import math
 import logging
 import sys
 import numpy as np
 import json
 import copy
+import collections
 import threading
 from threading import Thread, Event
 from datetime import datetime
@@ -26,6 +28,30 @@ from camera import Camera
 from config import DUAL_FISHEYE_CONFIG, STORAGE_CONFIG, APP_CONFIG
 from flask import Flask, render_template, Response, request, jsonify
 
+# Numba is optional; without it the maps are built with vectorized NumPy
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+# PyTurboJPEG is optional; without it preview frames are encoded with cv2.imencode
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420, TJFLAG_FASTDCT
+    turbo_jpeg = TurboJPEG()
+except Exception:  # ImportError, or libturbojpeg not found
+    turbo_jpeg = None
+
+# JPEG quality for the browser preview
+PREVIEW_JPEG_QUALITY = 80
+
+# Multipart framing around each MJPEG frame
+_MJPEG_HEADER = b'--frame\r\nContent-Type: image/jpeg\r\n\r\n'
+_MJPEG_TRAIL = b'\r\n'
+
+# Idle streams write at least this often (seconds), so the server notices
+# clients that have gone away and frees their worker
+STREAM_KEEPALIVE = 5.0
+
 # Configure logging
 logging.basicConfig(
     level=getattr(logging, APP_CONFIG['log_level']),
@@ -33,9 +59,183 @@ logging.basicConfig(
 )
 logger = logging.getLogger('web_debug_fisheye')
 
+def _project_numpy(equ_w, equ_h, radius):
+    """Compute the fisheye projection terms shared by both lenses for every output pixel"""
+    # Convert equirectangular coordinates to spherical (theta per column, phi per row)
+    theta = np.arange(equ_w) * (2 * np.pi / equ_w) - np.pi  # -pi to pi
+    phi = np.arange(equ_h) * (np.pi / equ_h)                # 0 to pi
+    
+    # Convert spherical to 3D Cartesian, broadcast to (equ_h, equ_w)
+    sin_phi = np.sin(phi)[:, None]
+    z3d = np.broadcast_to(np.cos(phi)[:, None], (equ_h, equ_w))
+    x3d = sin_phi * np.cos(theta)[None, :]
+    y3d = sin_phi * np.sin(theta)[None, :]
+    
+    # Distance from the lens axis and direction around the lens center
+    norm = radius * np.sqrt(x3d*x3d + z3d*z3d)
+    angle = np.arctan2(z3d, x3d)
+    return theta, norm, y3d, np.cos(angle), np.sin(angle)
+
+def _build_maps_numpy(equ_w, equ_h, cx1, cy1, cx2, cy2, radius, scale_factor, back_to_back):
+    """Build fisheye to equirectangular remap tables with vectorized NumPy"""
+    theta, norm, y3d, cos_angle, sin_angle = _project_numpy(equ_w, equ_h, radius)
+    
+    # Project 3D points to fisheye image coordinates
+    r = norm / (y3d + 1e-6) / scale_factor
+    
+    if back_to_back:
+        # Back-to-back cameras (opposite directions)
+        # Front hemisphere (-π/2 to π/2) uses the first camera,
+        # rear hemisphere uses the second camera facing the opposite direction.
+        # Both projections are computed in full and selected once by the mask.
+        front = (np.abs(theta) <= np.pi/2)[None, :]
+        
+        # Rotating theta by π mirrors the point for the rear camera:
+        # x3d -> -x3d and y3d -> -y3d, so angle -> π - angle and only the
+        # depth term of r changes; no extra trig is needed
+        r_rear = norm / (1e-6 - y3d) / scale_factor
+        
+        xmap = np.where(front, cx1 + r * cos_angle, cx2 - r_rear * cos_angle)
+        ymap = np.where(front, cy1 + r * sin_angle, cy2 + r_rear * sin_angle)
+    else:
+        # Original approach for side-by-side (not back-to-back) cameras:
+        # left hemisphere from the first lens, right hemisphere from the second
+        left = (theta < 0)[None, :]
+        xmap = np.where(left, cx1, cx2) + r * cos_angle
+        ymap = np.where(left, cy1, cy2) + r * sin_angle
+    
+    return xmap, ymap
+
+def _build_blend_strips(equ_w, equ_h, cx1, cy1, cx2, cy2, radius, scale_factor, overlap):
+    """Build per-lens remap tables and feathering weights for the seams of a back-to-back rig
+    
+    Returns one (x0, x1, front_maps, rear_maps, front_weight, rear_weight) tuple
+    per run of output columns where both lenses contribute.
+    """
+    if overlap <= 0:
+        return []
+    
+    theta, norm, y3d, cos_angle, sin_angle = _project_numpy(equ_w, equ_h, radius)
+    
+    # Rear camera weight ramps from 0 to 1 across the overlap centred on ±π/2
+    rear_weight = np.clip((np.abs(theta) - (np.pi/2 - overlap/2)) / overlap, 0, 1).astype(np.float32)
+    columns = np.flatnonzero((rear_weight > 0) & (rear_weight < 1))
+    
+    strips = []
+    for run in np.split(columns, np.flatnonzero(np.diff(columns) > 1) + 1):
+        if len(run) == 0:
+            continue
+        x0, x1 = int(run[0]), int(run[-1]) + 1
+        cols = slice(x0, x1)
+        
+        # Both lens projections for every pixel of the strip
+        r = norm[:, cols] / (y3d[:, cols] + 1e-6) / scale_factor
+        r_rear = norm[:, cols] / (1e-6 - y3d[:, cols]) / scale_factor
+        front_maps = cv2.convertMaps((cx1 + r * cos_angle[:, cols]).astype(np.float32),
+                                     (cy1 + r * sin_angle[:, cols]).astype(np.float32), cv2.CV_16SC2)
+        rear_maps = cv2.convertMaps((cx2 - r_rear * cos_angle[:, cols]).astype(np.float32),
+                                    (cy2 + r_rear * sin_angle[:, cols]).astype(np.float32), cv2.CV_16SC2)
+        
+        # Per-pixel weights for cv2.blendLinear
+        weight = np.tile(rear_weight[cols], (equ_h, 1))
+        strips.append((x0, x1, front_maps, rear_maps, 1 - weight, weight))
+    
+    return strips
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _build_maps_kernel(xmap, ymap, equ_w, equ_h, cx1, cy1, cx2, cy2, radius, scale_factor, back_to_back):
+        """Build fisheye to equirectangular remap tables in place, one row per thread"""
+        # Lens choice and azimuth trig only depend on the column, so compute
+        # them once here instead of once per pixel
+        first_lens = np.empty(equ_w, np.bool_)
+        cos_theta = np.empty(equ_w)
+        sin_theta = np.empty(equ_w)
+        
+        for x in range(equ_w):
+            # Convert equirectangular column to azimuth (-pi to pi)
+            theta = (x / equ_w) * 2 * math.pi - math.pi
+            cos_theta[x] = math.cos(theta)
+            sin_theta[x] = math.sin(theta)
+            
+            # Lens selection uses the integer column so fastmath cannot move
+            # pixels on the hemisphere boundaries:
+            # -pi/2 <= theta <= pi/2  <=>  equ_w <= 4x <= 3*equ_w
+            # theta < 0               <=>  2x < equ_w
+            if back_to_back:
+                # Front fisheye (first camera) or rear fisheye facing the opposite direction
+                first_lens[x] = equ_w <= 4 * x <= 3 * equ_w
+            else:
+                # Left / right hemisphere for side-by-side cameras
+                first_lens[x] = 2 * x < equ_w
+        
+        for y in prange(equ_h):
+            # Convert equirectangular row to polar angle (0 to pi)
+            phi = (y / equ_h) * math.pi
+            sin_phi = math.sin(phi)
+            z3d = math.cos(phi)
+            zz = z3d * z3d
+            
+            for x in range(equ_w):
+                # Spherical to 3D Cartesian
+                x3d = sin_phi * cos_theta[x]
+                y3d = sin_phi * sin_theta[x]
+                
+                # Long runs of columns share a lens, so this branch predicts well
+                if first_lens[x]:
+                    cx, cy = cx1, cy1
+                elif back_to_back:
+                    # Rear camera sees theta rotated by π: mirror x3d and y3d
+                    # instead of recomputing the trig
+                    cx, cy = cx2, cy2
+                    x3d = -x3d
+                    y3d = -y3d
+                else:
+                    cx, cy = cx2, cy2
+                
+                # Project to the fisheye image
+                r = radius * math.sqrt(x3d*x3d + zz) / (y3d + 1e-6) / scale_factor
+                angle = math.atan2(z3d, x3d)
+                
+                xmap[y, x] = cx + r * math.cos(angle)
+                ymap[y, x] = cy + r * math.sin(angle)
+else:
+    _build_maps_kernel = None
+
+def _build_maps(equ_w, equ_h, cx1, cy1, cx2, cy2, radius, scale_factor, back_to_back):
+    """Build float32 remap tables with the compiled kernel when available"""
+    if _build_maps_kernel is not None:
+        # Compiled kernel writes straight into the map arrays
+        xmap = np.empty((equ_h, equ_w), np.float32)
+        ymap = np.empty((equ_h, equ_w), np.float32)
+        _build_maps_kernel(xmap, ymap, equ_w, equ_h, cx1, cy1, cx2, cy2,
+                           radius, scale_factor, back_to_back)
+        return xmap, ymap
+    
+    xmap, ymap = _build_maps_numpy(equ_w, equ_h, cx1, cy1, cx2, cy2,
+                                   radius, scale_factor, back_to_back)
+    return xmap.astype(np.float32), ymap.astype(np.float32)
+
+def _cuda_device_available():
+    """Check whether OpenCV has CUDA support and a CUDA device is present"""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
+
 class WebDebugFisheyeCamera(Camera):
     """Web debug class for dual fisheye camera with parameter adjustment via web interface"""
     
+    # Number of recently used map sets kept while tuning parameters
+    _MAP_CACHE_MAX = 8
+    
+    # Config entries the remap tables depend on (flips are applied after remapping)
+    _MAP_PARAMS = ('cx1', 'cy1', 'cx2', 'cy2', 'radius_scale', 'field_of_view', 'fisheye_overlap',
+                   'back_to_back', 'smooth_transition', 'width', 'height', 'equ_height_ratio')
+    
+    # Attributes built by _create_fisheye_maps and stored in the map cache
+    _MAP_ATTRS = ('_preview_maps', '_gpu_preview_maps', '_preview_blend_strips')
+    
     def __init__(self, sync_manager=None):
         """Initialize the WebDebugFisheyeCamera class"""
         # Initialize parent Camera class
@@ -54,13 +254,40 @@ class WebDebugFisheyeCamera(Camera):
         # Equirectangular frame
         self.equirectangular_frame = None
         
+        # Debug view: markers/text are rendered once into a color + alpha layer
+        # and only redrawn when parameters change; the composite buffer is reused
+        self._overlay_shape = None
+        self._overlay_idx = None
+        self._overlay_bgr = None
+        self._overlay_inv_alpha = None
+        self._overlay_dirty = True
+        self._composite_buf = None
+        
         # Thread for processing
         self.process_thread = None
         
-        # Calibration
-        self.fisheye_xmap = None
-        self.fisheye_ymap = None
+        # Half-resolution tables for the browser preview, applied to a pyrDown'd frame
+        # (fixed-point remap tables from cv2.convertMaps)
+        self._preview_maps = None
+        # Seam feathering for smooth_transition (see _build_blend_strips)
+        self._preview_blend_strips = []
+        # Full-resolution set for get_equirectangular, only built when it is used
+        self.map1 = None
+        self.map2 = None
+        self._blend_strips = []
+        self._full_maps_key = None
         self.calibration_initialized = False
+        self._map_cache = collections.OrderedDict()
+        
+        # GPU remap (float maps and frame buffers stay on the device across frames)
+        self._use_cuda = _cuda_device_available()
+        self._gpu_preview_maps = None
+        self._gpu_map1 = None
+        self._gpu_map2 = None
+        if self._use_cuda:
+            self._gpu_src = cv2.cuda_GpuMat()
+            self._gpu_dst = cv2.cuda_GpuMat()
+            self.logger.info("CUDA device found, remapping on GPU")
     
     def update_parameters(self, params):
         """Update parameters from web interface"""
@@ -78,10 +305,10 @@ class WebDebugFisheyeCamera(Camera):
             if key in params:
                 self.config[key] = bool(params[key])
         
-        # Reset calibration to force recalculation of maps
+        # Mark calibration stale; _create_fisheye_maps reuses cached maps
+        # when these parameters have been seen before
         self.calibration_initialized = False
-        self.fisheye_xmap = None
-        self.fisheye_ymap = None
+        self._overlay_dirty = True
         
         # Log new parameters
         self.logger.info(f"Updated parameters: CX1={self.config['cx1']}, CY1={self.config['cy1']}, "
@@ -98,186 +325,188 @@ class WebDebugFisheyeCamera(Camera):
         """Save current parameters to a file"""
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"fisheye_params_{timestamp}.txt"
-        
-        with open(filename, 'w') as f:
-            f.write("# Dual Fisheye Parameters\n")
-            f.write(f"CX1 = {self.config['cx1']}\n")
-            f.write(f"CY1 = {self.config['cy1']}\n")
-            f.write(f"CX2 = {self.config['cx2']}\n")
-            f.write(f"CY2 = {self.config['cy2']}\n")
-            f.write(f"RADIUS_SCALE = {self.config['radius_scale']}\n")
-            f.write(f"FIELD_OF_VIEW = {self.config['field_of_view']}\n")
-            f.write(f"OVERLAP = {self.config['fisheye_overlap']}\n")
-            f.write(f"BACK_TO_BACK = {self.config['back_to_back']}\n")
-            f.write(f"SMOOTH_TRANSITION = {self.config['smooth_transition']}\n")
-            f.write(f"VERTICAL_FLIP = {self.config['vertical_flip']}\n")
-            f.write(f"HORIZONTAL_FLIP = {self.config['horizontal_flip']}\n")
-            
+        c = self.config
+        
+        # Build the whole file up front so it reflects the parameters at the
+        # time of the request, then write it in the background
+        lines = [
+            "# Dual Fisheye Parameters",
+            f"CX1 = {c['cx1']}",
+            f"CY1 = {c['cy1']}",
+            f"CX2 = {c['cx2']}",
+            f"CY2 = {c['cy2']}",
+            f"RADIUS_SCALE = {c['radius_scale']}",
+            f"FIELD_OF_VIEW = {c['field_of_view']}",
+            f"OVERLAP = {c['fisheye_overlap']}",
+            f"BACK_TO_BACK = {c['back_to_back']}",
+            f"SMOOTH_TRANSITION = {c['smooth_transition']}",
+            f"VERTICAL_FLIP = {c['vertical_flip']}",
+            f"HORIZONTAL_FLIP = {c['horizontal_flip']}",
+            "",
             # Add configuration code snippet
-            f.write("\n# Configuration for config.py:\n")
-            f.write("'''\n")
-            f.write("DUAL_FISHEYE_CONFIG = {\n")
-            f.write(f"    'cx1': {self.config['cx1']},\n")
-            f.write(f"    'cy1': {self.config['cy1']},\n")
-            f.write(f"    'cx2': {self.config['cx2']},\n")
-            f.write(f"    'cy2': {self.config['cy2']},\n")
-            f.write(f"    'radius_scale': {self.config['radius_scale']},\n")
-            f.write(f"    'field_of_view': {self.config['field_of_view']},\n")
-            f.write(f"    'fisheye_overlap': {self.config['fisheye_overlap']},\n")
-            f.write(f"    'back_to_back': {self.config['back_to_back']},\n")
-            f.write(f"    'smooth_transition': {self.config['smooth_transition']},\n")
-            f.write(f"    'vertical_flip': {self.config['vertical_flip']},\n")
-            f.write(f"    'horizontal_flip': {self.config['horizontal_flip']},\n")
-            f.write("}\n")
-            f.write("'''\n")
-        
-        self.logger.info(f"Parameters saved to {filename}")
+            "# Configuration for config.py:",
+            "'''",
+            "DUAL_FISHEYE_CONFIG = {",
+            f"    'cx1': {c['cx1']},",
+            f"    'cy1': {c['cy1']},",
+            f"    'cx2': {c['cx2']},",
+            f"    'cy2': {c['cy2']},",
+            f"    'radius_scale': {c['radius_scale']},",
+            f"    'field_of_view': {c['field_of_view']},",
+            f"    'fisheye_overlap': {c['fisheye_overlap']},",
+            f"    'back_to_back': {c['back_to_back']},",
+            f"    'smooth_transition': {c['smooth_transition']},",
+            f"    'vertical_flip': {c['vertical_flip']},",
+            f"    'horizontal_flip': {c['horizontal_flip']},",
+            "}",
+            "'''",
+        ]
+        body = "\n".join(lines) + "\n"
+        
+        Thread(target=self._write_parameters_file, args=(filename, body), daemon=True).start()
         return filename
     
+    def _write_parameters_file(self, filename, body):
+        """Write a parameters file in one call, replacing it atomically"""
+        tmp_path = filename + ".tmp"
+        try:
+            with open(tmp_path, 'w') as f:
+                f.write(body)
+            os.replace(tmp_path, filename)
+            self.logger.info(f"Parameters saved to {filename}")
+        except Exception as e:
+            self.logger.error(f"Error saving parameters: {str(e)}")
+    
     def _create_fisheye_maps(self):
-        """Create mapping for fisheye to equirectangular conversion"""
+        """Create mapping for fisheye to equirectangular conversion (browser preview size)"""
         # Only create maps if not already initialized
         if self.calibration_initialized:
             return
-            
-        # Get frame dimensions
-        width = self.config['width']
-        height = self.config['height']
+        
+        # update_parameters runs on a Flask thread, so work from one snapshot:
+        # the cache key and every map parameter come from the same values
+        config = dict(self.config)
+        
+        # Reuse maps for parameter sets seen recently (common when dragging sliders).
+        # Flips are applied after remapping and are not part of the maps.
+        key = self._map_key(config)
+        cached = self._map_cache.get(key)
+        if cached is not None:
+            self._map_cache.move_to_end(key)
+            for name, value in zip(self._MAP_ATTRS, cached):
+                setattr(self, name, value)
+            self._mark_maps_initialized(key)
+            return
         
         # Create maps
-        self.logger.info(f"Creating fisheye mapping with dimensions {width}x{height} "
-                         f"for {self.config.get('field_of_view')}° camera")
+        self.logger.info(f"Creating fisheye mapping with dimensions {config['width']}x{config['height']} "
+                         f"for {config.get('field_of_view')}° camera")
+        
+        equ_w, equ_h, cx1, cy1, cx2, cy2, radius, scale_factor, overlap, back_to_back = self._map_geometry(config)
+        
+        # Preview maps: half the output size, sampling a frame halved by pyrDown
+        # (pyrDown pixel i is centered on source pixel 2i, so coordinates halve)
+        preview_xmap, preview_ymap = _build_maps(equ_w // 2, equ_h // 2, cx1 / 2, cy1 / 2, cx2 / 2, cy2 / 2,
+                                                 radius / 2, scale_factor, back_to_back)
+        self._preview_maps = cv2.convertMaps(preview_xmap, preview_ymap, cv2.CV_16SC2)
+        
+        # cv2.cuda.remap takes float maps, so upload them before they are dropped
+        if self._use_cuda:
+            self._gpu_preview_maps = (cv2.cuda_GpuMat(), cv2.cuda_GpuMat())
+            self._gpu_preview_maps[0].upload(preview_xmap)
+            self._gpu_preview_maps[1].upload(preview_ymap)
+        
+        # Optionally smooth the transition regions: across the overlap around
+        # ±π/2 both lenses are remapped and feathered instead of hard-cut
+        if config.get('smooth_transition', True) and back_to_back:
+            self._preview_blend_strips = _build_blend_strips(equ_w // 2, equ_h // 2, cx1 / 2, cy1 / 2, cx2 / 2, cy2 / 2,
+                                                             radius / 2, scale_factor, overlap)
+        else:
+            self._preview_blend_strips = []
+        
+        self._map_cache[key] = tuple(getattr(self, name) for name in self._MAP_ATTRS)
+        if len(self._map_cache) > self._MAP_CACHE_MAX:
+            self._map_cache.popitem(last=False)
+        
+        self._mark_maps_initialized(key)
+        self.logger.info(f"Fisheye calibration maps created successfully for {config.get('field_of_view')}° camera")
+    
+    def _create_full_maps(self):
+        """Create the full-resolution maps for get_equirectangular (built on first use, not cached)"""
+        config = dict(self.config)
+        key = self._map_key(config)
+        if key == self._full_maps_key:
+            return
+        
+        self.logger.info(f"Creating full-resolution fisheye mapping {config['width']}x{config['height']}")
+        equ_w, equ_h, cx1, cy1, cx2, cy2, radius, scale_factor, overlap, back_to_back = self._map_geometry(config)
+        
+        xmap, ymap = _build_maps(equ_w, equ_h, cx1, cy1, cx2, cy2,
+                                 radius, scale_factor, back_to_back)
+        
+        # cv2.cuda.remap takes float maps, so upload them before they are dropped
+        if self._use_cuda:
+            self._gpu_map1 = cv2.cuda_GpuMat()
+            self._gpu_map1.upload(xmap)
+            self._gpu_map2 = cv2.cuda_GpuMat()
+            self._gpu_map2.upload(ymap)
+        
+        # Convert maps to the fixed-point format used by the fast remap path
+        # (CV_16SC2 coordinates + CV_16UC1 interpolation table); the float
+        # maps are not kept
+        self.map1, self.map2 = cv2.convertMaps(xmap, ymap, cv2.CV_16SC2)
+        
+        if config.get('smooth_transition', True) and back_to_back:
+            self._blend_strips = _build_blend_strips(equ_w, equ_h, cx1, cy1, cx2, cy2,
+                                                     radius, scale_factor, overlap)
+        else:
+            self._blend_strips = []
+        
+        # A config change during the build leaves a stale key, so the next call rebuilds
+        self._full_maps_key = key
+    
+    def _map_geometry(self, config):
+        """Output size and lens geometry for a config snapshot"""
+        # Get frame dimensions
+        width = config['width']
+        height = config['height']
         
         # Create destination map
-        equ_h = int(height * self.config.get('equ_height_ratio', 0.5))
+        equ_h = int(height * config.get('equ_height_ratio', 0.5))
         equ_w = width
         
-        # Create empty maps for x and y coordinate mappings
-        self.fisheye_xmap = np.zeros((equ_h, equ_w), np.float32)
-        self.fisheye_ymap = np.zeros((equ_h, equ_w), np.float32)
-        
         # Calculate center point for each fisheye lens
-        cx1 = self.config.get('cx1')  # Left fisheye center x
-        cy1 = self.config.get('cy1')  # Left fisheye center y
-        cx2 = self.config.get('cx2')  # Right fisheye center x
-        cy2 = self.config.get('cy2')  # Right fisheye center y
+        cx1 = config.get('cx1')  # Left fisheye center x
+        cy1 = config.get('cy1')  # Left fisheye center y
+        cx2 = config.get('cx2')  # Right fisheye center x
+        cy2 = config.get('cy2')  # Right fisheye center y
         
         # Calculate radius for fisheye lens
         radius = min(cx1, cy1) if cx1 < cx2 else min(width - cx2, cy2)
-        radius = int(radius * self.config.get('radius_scale'))
+        radius = int(radius * config.get('radius_scale'))
         
         # Get field of view and overlap parameters
-        fov = np.radians(self.config.get('field_of_view'))  # Camera FOV in radians
-        overlap = np.radians(self.config.get('fisheye_overlap'))  # Overlap region in radians
+        fov = np.radians(config.get('field_of_view'))  # Camera FOV in radians
+        overlap = np.radians(config.get('fisheye_overlap'))  # Overlap region in radians
         
         # Calculate maximum theta angle based on field of view
         max_theta = fov / 2
+        scale_factor = max_theta / (np.pi/2)  # Adjust scaling for FOV
         
         # Flag for 180° opposite direction camera setup
-        back_to_back = self.config.get('back_to_back', True)
+        back_to_back = config.get('back_to_back', True)
         
-        # Create maps for back-to-back camera setup
-        for y in range(equ_h):
-            for x in range(equ_w):
-                # Convert equirectangular coordinates to spherical
-                theta = (x / equ_w) * 2 * np.pi - np.pi  # -pi to pi
-                phi = (y / equ_h) * np.pi                # 0 to pi
-                
-                # Apply vertical flip if needed
-                if self.config.get('vertical_flip', False):
-                    phi = np.pi - phi
-                
-                # Apply horizontal flip if needed
-                if self.config.get('horizontal_flip', False):
-                    theta = -theta
-                
-                # Convert spherical to 3D Cartesian
-                x3d = np.sin(phi) * np.cos(theta)
-                y3d = np.sin(phi) * np.sin(theta)
-                z3d = np.cos(phi)
-                
-                # Back-to-back cameras (opposite directions)
-                if back_to_back:
-                    # Use the appropriate fisheye lens based on the horizontal angle (theta)
-                    # Front hemisphere: -π/2 to π/2
-                    # Rear hemisphere: π/2 to 3π/2 (or -3π/2 to -π/2)
-                    if -np.pi/2 <= theta <= np.pi/2:
-                        # Front fisheye (first camera)
-                        # Project 3D point to fisheye image
-                        r = radius * np.sqrt(x3d*x3d + z3d*z3d) / (y3d + 1e-6)
-                        angle = np.arctan2(z3d, x3d)
-                        
-                        # Scale for field of view
-                        scale_factor = max_theta / (np.pi/2)  # Adjust scaling for FOV
-                        r = r / scale_factor
-                        
-                        # Map to image coordinates
-                        self.fisheye_xmap[y, x] = cx1 + r * np.cos(angle)
-                        self.fisheye_ymap[y, x] = cy1 + r * np.sin(angle)
-                    else:
-                        # Rear fisheye (second camera)
-                        # For back-to-back cameras, we need to flip the direction
-                        # Since the second camera is facing the opposite direction
-                        theta_adjusted = theta - np.pi if theta > 0 else theta + np.pi
-                        
-                        # Recalculate 3D position for the rear camera
-                        x3d_rear = np.sin(phi) * np.cos(theta_adjusted)
-                        y3d_rear = np.sin(phi) * np.sin(theta_adjusted)
-                        z3d_rear = np.cos(phi)
-                        
-                        # Project to fisheye coordinates
-                        r = radius * np.sqrt(x3d_rear*x3d_rear + z3d_rear*z3d_rear) / (y3d_rear + 1e-6)
-                        angle = np.arctan2(z3d_rear, x3d_rear)
-                        
-                        # Scale for field of view
-                        scale_factor = max_theta / (np.pi/2)
-                        r = r / scale_factor
-                        
-                        # Map to image coordinates (second camera)
-                        self.fisheye_xmap[y, x] = cx2 + r * np.cos(angle)
-                        self.fisheye_ymap[y, x] = cy2 + r * np.sin(angle)
-                else:
-                    # Original approach for side-by-side (not back-to-back) cameras
-                    if theta < 0:  # Left hemisphere
-                        # Calculate fisheye projection parameters
-                        r = radius * np.sqrt(x3d*x3d + z3d*z3d) / (y3d + 1e-6)
-                        angle = np.arctan2(z3d, x3d)
-                        
-                        # Scale for field of view
-                        scale_factor = max_theta / (np.pi/2)  # Adjust scaling for FOV
-                        r = r / scale_factor
-                        
-                        # Map to coordinates
-                        self.fisheye_xmap[y, x] = cx1 + r * np.cos(angle)
-                        self.fisheye_ymap[y, x] = cy1 + r * np.sin(angle)
-                    else:  # Right hemisphere
-                        # Calculate fisheye projection parameters
-                        r = radius * np.sqrt(x3d*x3d + z3d*z3d) / (y3d + 1e-6)
-                        angle = np.arctan2(z3d, x3d)
-                        
-                        # Scale for field of view
-                        scale_factor = max_theta / (np.pi/2)
-                        r = r / scale_factor
-                        
-                        # Map to coordinates
-                        self.fisheye_xmap[y, x] = cx2 + r * np.cos(angle)
-                        self.fisheye_ymap[y, x] = cy2 + r * np.sin(angle)
-        
-        # Optionally apply smoothing to the transition regions
-        if self.config.get('smooth_transition', True) and back_to_back:
-            blend_width = int(equ_w * 0.05)  # 5% of width for blending on each side
-            front_back_boundary1 = int(equ_w * 0.25)  # Around -π/2
-            front_back_boundary2 = int(equ_w * 0.75)  # Around π/2
-            
-            # Actual blending implementation would be done here
-            # This is a placeholder for a more advanced blending algorithm
-        
-        # Convert maps to correct format for remap
-        self.fisheye_xmap = self.fisheye_xmap.astype(np.float32)
-        self.fisheye_ymap = self.fisheye_ymap.astype(np.float32)
-        
-        self.calibration_initialized = True
-        self.logger.info(f"Fisheye calibration maps created successfully for {self.config.get('field_of_view')}° camera")
+        return equ_w, equ_h, cx1, cy1, cx2, cy2, radius, scale_factor, overlap, back_to_back
+    
+    def _map_key(self, config):
+        """Map cache key: the config entries the remap tables depend on"""
+        return tuple(config.get(name) for name in self._MAP_PARAMS)
+    
+    def _mark_maps_initialized(self, key):
+        """Mark the maps current, unless the parameters changed while they were built"""
+        self._overlay_dirty = True
+        if self._map_key(self.config) == key:
+            self.calibration_initialized = True
     
     def start(self):
         """Start camera capture"""
@@ -290,6 +519,9 @@ class WebDebugFisheyeCamera(Camera):
     
     def stop(self):
         """Stop camera capture"""
+        self.stop_event.set()
+        with self.frame_cond:
+            self.frame_cond.notify_all()
         if self.process_thread:
             self.process_thread.join(timeout=3.0)
         super().stop()  # Call parent stop method
@@ -303,64 +535,110 @@ class WebDebugFisheyeCamera(Camera):
                     if not self.calibration_initialized:
                         self._create_fisheye_maps()
                     
-                    # Get equirectangular frame
-                    self.equirectangular_frame = self.get_equirectangular(self.frame)
+                    # Get equirectangular frame (only shown in the browser preview).
+                    # The debug view is for checking center alignment, so the
+                    # cheaper nearest-neighbour lookup is good enough there.
+                    interp = cv2.INTER_NEAREST if self.debug_mode == 2 else cv2.INTER_LINEAR
+                    self.equirectangular_frame = self.get_preview_equirectangular(self.frame, interp)
                 
-                # Small delay to match framerate
-                time.sleep(0.01)
+                # Wait for the capture loop to deliver the next frame
+                with self.frame_cond:
+                    self.frame_cond.wait(timeout=0.5)
         
         except Exception as e:
             self.logger.error(f"Process loop error: {str(e)}")
     
-    def get_equirectangular(self, frame):
+    def get_equirectangular(self, frame, interp=cv2.INTER_LINEAR):
         """Convert frame to equirectangular projection"""
         if frame is None:
             return None
         
         try:
-            # Create calibration maps if needed
-            if not self.calibration_initialized:
-                self._create_fisheye_maps()
-            
-            # Get equirectangular dimensions
-            equ_h = int(frame.shape[0] * self.config.get('equ_height_ratio', 0.5))
-            equ_w = frame.shape[1]
+            # Create (or refresh) the full-resolution maps if needed
+            self._create_full_maps()
             
             # Remap using the pre-calculated maps
-            equirectangular = cv2.remap(frame, self.fisheye_xmap, self.fisheye_ymap, 
-                                        cv2.INTER_LINEAR, borderMode=cv2.BORDER_WRAP)
+            if self._use_cuda:
+                self._gpu_src.upload(frame)
+                cv2.cuda.remap(self._gpu_src, self._gpu_map1, self._gpu_map2,
+                               interp, dst=self._gpu_dst, borderMode=cv2.BORDER_WRAP)
+                equirectangular = self._gpu_dst.download()
+            else:
+                equirectangular = cv2.remap(frame, self.map1, self.map2, 
+                                            interp, borderMode=cv2.BORDER_WRAP)
             
-            return equirectangular
+            self._blend_seams(frame, equirectangular, self._blend_strips, interp)
+            return self._apply_flips(equirectangular)
         except Exception as e:
             self.logger.error(f"Equirectangular conversion error: {str(e)}")
             return None
     
-    def get_debug_view(self, frame):
-        """Create debug view showing original and converted images"""
+    def get_preview_equirectangular(self, frame, interp=cv2.INTER_LINEAR):
+        """Convert frame to a half-resolution equirectangular projection for preview"""
         if frame is None:
             return None
         
-        # Get equirectangular projection
-        equirect_frame = self.equirectangular_frame
-        if equirect_frame is None:
-            return frame
+        try:
+            # Create calibration maps if needed
+            if not self.calibration_initialized:
+                self._create_fisheye_maps()
+            
+            # Halve the frame, then remap with the half-size maps (a quarter of the work)
+            small = cv2.pyrDown(frame)
+            if self._use_cuda:
+                gpu_map1, gpu_map2 = self._gpu_preview_maps
+                self._gpu_src.upload(small)
+                cv2.cuda.remap(self._gpu_src, gpu_map1, gpu_map2,
+                               interp, dst=self._gpu_dst, borderMode=cv2.BORDER_WRAP)
+                equirectangular = self._gpu_dst.download()
+            else:
+                preview_map1, preview_map2 = self._preview_maps
+                equirectangular = cv2.remap(small, preview_map1, preview_map2,
+                                            interp, borderMode=cv2.BORDER_WRAP)
+            
+            self._blend_seams(small, equirectangular, self._preview_blend_strips, interp)
+            return self._apply_flips(equirectangular)
+        except Exception as e:
+            self.logger.error(f"Preview equirectangular conversion error: {str(e)}")
+            return None
+    
+    def _blend_seams(self, frame, equirectangular, strips, interp):
+        """Feather the lens seams by blending both lens projections across the overlap"""
+        for x0, x1, front_maps, rear_maps, front_weight, rear_weight in strips:
+            front = cv2.remap(frame, front_maps[0], front_maps[1], interp, borderMode=cv2.BORDER_WRAP)
+            rear = cv2.remap(frame, rear_maps[0], rear_maps[1], interp, borderMode=cv2.BORDER_WRAP)
+            equirectangular[:, x0:x1] = cv2.blendLinear(front, rear, front_weight, rear_weight)
+    
+    def _apply_flips(self, equirectangular):
+        """Apply flips on the output instead of baking them into the maps"""
+        # Flipping theta -> -theta (phi -> pi - phi) sends pixel i to
+        # pixel (N - i) % N, so row/column 0 stays and the rest is mirrored.
+        if self.config.get('vertical_flip', False):
+            equirectangular[1:] = equirectangular[:0:-1]
+        if self.config.get('horizontal_flip', False):
+            equirectangular[:, 1:] = equirectangular[:, :0:-1]
+        
+        return equirectangular
+    
+    def _draw_overlay(self, canvas, frame_h):
+        """Draw center points, radius circles, parameters and labels onto the composite canvas"""
+        top = canvas[:frame_h]  # Original frame area
+        frame_w = canvas.shape[1]
         
-        # Draw center points and radius on original frame
-        debug_frame = frame.copy()
         cx1 = self.config.get('cx1')
         cy1 = self.config.get('cy1')
         cx2 = self.config.get('cx2')
         cy2 = self.config.get('cy2')
         
         # Calculate radius
-        radius = min(cx1, cy1) if cx1 < cx2 else min(debug_frame.shape[1] - cx2, cy2)
+        radius = min(cx1, cy1) if cx1 < cx2 else min(frame_w - cx2, cy2)
         radius = int(radius * self.config.get('radius_scale'))
         
         # Draw circles at center points and radius
-        cv2.circle(debug_frame, (cx1, cy1), 5, (0, 0, 255), -1)  # Red dot for center 1
-        cv2.circle(debug_frame, (cx2, cy2), 5, (0, 0, 255), -1)  # Red dot for center 2
-        cv2.circle(debug_frame, (cx1, cy1), radius, (0, 255, 0), 2)  # Green circle for radius 1
-        cv2.circle(debug_frame, (cx2, cy2), radius, (0, 255, 0), 2)  # Green circle for radius 2
+        cv2.circle(top, (cx1, cy1), 5, (0, 0, 255), -1)  # Red dot for center 1
+        cv2.circle(top, (cx2, cy2), 5, (0, 0, 255), -1)  # Red dot for center 2
+        cv2.circle(top, (cx1, cy1), radius, (0, 255, 0), 2)  # Green circle for radius 1
+        cv2.circle(top, (cx2, cy2), radius, (0, 255, 0), 2)  # Green circle for radius 2
         
         # Add parameter text
         font = cv2.FONT_HERSHEY_SIMPLEX
@@ -368,30 +646,78 @@ class WebDebugFisheyeCamera(Camera):
         padding = 10
         
         # Parameters on original frame
-        cv2.putText(debug_frame, f"CX1: {cx1}, CY1: {cy1}", 
+        cv2.putText(top, f"CX1: {cx1}, CY1: {cy1}", 
                     (padding, padding + line_height), font, 0.6, (255, 255, 0), 2)
-        cv2.putText(debug_frame, f"CX2: {cx2}, CY2: {cy2}", 
+        cv2.putText(top, f"CX2: {cx2}, CY2: {cy2}", 
                     (padding, padding + 2*line_height), font, 0.6, (255, 255, 0), 2)
-        cv2.putText(debug_frame, f"Radius Scale: {self.config.get('radius_scale'):.2f}", 
+        cv2.putText(top, f"Radius Scale: {self.config.get('radius_scale'):.2f}", 
                     (padding, padding + 3*line_height), font, 0.6, (255, 255, 0), 2)
         
         # Add camera configuration
         back_to_back = "Back-to-back" if self.config.get('back_to_back', True) else "Side-by-side"
-        cv2.putText(debug_frame, f"Mode: {back_to_back}, FOV: {self.config.get('field_of_view')}°",
+        cv2.putText(top, f"Mode: {back_to_back}, FOV: {self.config.get('field_of_view')}°",
                     (padding, padding + 4*line_height), font, 0.6, (255, 255, 0), 2)
         
-        # Create composite view: original frame on top, equirectangular on bottom
-        if debug_frame.shape[0] != equirect_frame.shape[0] or debug_frame.shape[1] != equirect_frame.shape[1]:
-            equirect_frame = cv2.resize(equirect_frame, (debug_frame.shape[1], debug_frame.shape[0]))
-        
-        composite = np.vstack((debug_frame, equirect_frame))
-        
         # Add labels
-        label_y_pos = debug_frame.shape[0] - padding
-        cv2.putText(composite, "Original with Center Points", 
+        label_y_pos = frame_h - padding
+        cv2.putText(canvas, "Original with Center Points", 
                     (padding, label_y_pos), font, 0.8, (255, 255, 255), 2)
-        cv2.putText(composite, "Equirectangular Conversion", 
-                    (padding, label_y_pos + debug_frame.shape[0] + line_height), font, 0.8, (255, 255, 255), 2)
+        cv2.putText(canvas, "Equirectangular Conversion", 
+                    (padding, label_y_pos + frame_h + line_height), font, 0.8, (255, 255, 255), 2)
+    
+    def _render_overlay(self, composite_shape):
+        """Render the debug overlay once into a cached color + alpha layer"""
+        frame_h = composite_shape[0] // 2
+        
+        # Drawing (including anti-aliased text) maps each pixel p to
+        # p * (1 - alpha) + color * alpha, so rendering on black gives
+        # color * alpha and rendering on white additionally gives 1 - alpha
+        on_black = np.zeros(composite_shape, np.uint8)
+        on_white = np.full(composite_shape, 255, np.uint8)
+        self._draw_overlay(on_black, frame_h)
+        self._draw_overlay(on_white, frame_h)
+        inv_alpha = on_white.astype(np.int16) - on_black
+        
+        # Keep only the drawn pixels: flat indices, premultiplied color, 255 * (1 - alpha)
+        inv_alpha = inv_alpha.reshape(-1, 3)
+        self._overlay_idx = np.flatnonzero((inv_alpha != 255).any(axis=1))
+        self._overlay_bgr = on_black.reshape(-1, 3)[self._overlay_idx].astype(np.uint16)
+        self._overlay_inv_alpha = np.clip(inv_alpha[self._overlay_idx], 0, 255).astype(np.uint16)
+        self._overlay_shape = composite_shape
+        self._overlay_dirty = False
+    
+    def get_debug_view(self, frame):
+        """Create debug view showing original and converted images"""
+        if frame is None:
+            return None
+        
+        # Get equirectangular projection
+        equirect_frame = self.equirectangular_frame
+        if equirect_frame is None:
+            return frame
+        
+        frame_h, frame_w = frame.shape[:2]
+        
+        # Create composite view: original frame on top, equirectangular on bottom
+        composite_shape = (2 * frame_h,) + frame.shape[1:]
+        if self._composite_buf is None or self._composite_buf.shape != composite_shape:
+            self._composite_buf = np.empty(composite_shape, frame.dtype)
+        composite = self._composite_buf
+        np.copyto(composite[:frame_h], frame)
+        
+        # Scale the (half-resolution) equirectangular frame straight into the bottom half
+        if equirect_frame.shape == frame.shape:
+            np.copyto(composite[frame_h:], equirect_frame)
+        else:
+            cv2.resize(equirect_frame, (frame_w, frame_h), dst=composite[frame_h:])
+        
+        # Stamp center points, radius circles, parameters and labels
+        # (alpha blend, which is a plain copy where the overlay is opaque)
+        if self._overlay_dirty or self._overlay_shape != composite_shape:
+            self._render_overlay(composite_shape)
+        pixels = composite.reshape(-1, 3)
+        under = pixels[self._overlay_idx] * self._overlay_inv_alpha
+        pixels[self._overlay_idx] = (under + 127) // 255 + self._overlay_bgr
         
         return composite
     
@@ -400,15 +726,17 @@ class WebDebugFisheyeCamera(Camera):
         if self.frame is None:
             return None
             
+        # The capture and process threads allocate a new array for every
+        # frame, so the current one can be handed out without copying
         if self.debug_mode == 0:
             # Original frame
-            return self.frame.copy()
+            return self.frame
         elif self.debug_mode == 1:
             # Equirectangular only
             if self.equirectangular_frame is not None:
-                return self.equirectangular_frame.copy()
+                return self.equirectangular_frame
             else:
-                return self.frame.copy()
+                return self.frame
         else:
             # Debug view with both frames and markers
             return self.get_debug_view(self.frame)
@@ -419,7 +747,8 @@ recording = False
 preview_thread = None
 stop_preview = False
 last_frame = None
-frame_lock = threading.Lock()
+frame_cond = threading.Condition()  # Notified when last_frame is updated
+frame_seq = 0
 
 # Create Flask app
 app = Flask(__name__)
@@ -440,23 +769,31 @@ def convert_frame_to_jpeg(frame):
         scale = max_width / frame_width
         new_width = int(frame_width * scale)
         new_height = int(frame_height * scale)
-        frame = cv2.resize(frame, (new_width, new_height))
+        frame = cv2.resize(frame, (new_width, new_height), interpolation=cv2.INTER_AREA)
     
     # Convert to jpeg
-    _, buffer = cv2.imencode('.jpg', frame)
+    if turbo_jpeg is not None:
+        return turbo_jpeg.encode(frame, quality=PREVIEW_JPEG_QUALITY, pixel_format=TJPF_BGR,
+                                 jpeg_subsample=TJSAMP_420, flags=TJFLAG_FASTDCT)
+    
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, PREVIEW_JPEG_QUALITY,
+                                             cv2.IMWRITE_JPEG_OPTIMIZE, 0])
     return buffer.tobytes()
 
 # Preview update thread
 def update_preview():
-    global stop_preview, last_frame
+    global stop_preview, last_frame, frame_seq
     
     while not stop_preview:
         if camera and camera.running:
             frame = camera.get_preview_frame()
             
             if frame is not None:
-                with frame_lock:
-                    last_frame = convert_frame_to_jpeg(frame)
+                jpeg = convert_frame_to_jpeg(frame)
+                with frame_cond:
+                    last_frame = jpeg
+                    frame_seq += 1
+                    frame_cond.notify_all()
         
         time.sleep(0.1)  # Update at ~10 FPS to reduce CPU load
 
@@ -464,13 +801,36 @@ def update_preview():
 def generate_frames():
     global last_frame
     
+    seen_seq = -1
+    sent_jpeg = None
+    last_write = time.monotonic()
     while True:
-        with frame_lock:
-            if last_frame is not None:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + last_frame + b'\r\n')
-        
-        time.sleep(0.1)
+        # Sleep until update_preview publishes a frame we have not sent yet
+        with frame_cond:
+            frame_cond.wait_for(lambda: frame_seq != seen_seq, timeout=1.0)
+            jpeg = last_frame
+            new_frame = frame_seq != seen_seq
+            seen_seq = frame_seq
+        
+        if new_frame and jpeg is not None:
+            sent_jpeg = jpeg
+        elif time.monotonic() - last_write >= STREAM_KEEPALIVE:
+            # No new frame (camera stopped): write anyway so a closed
+            # connection is detected. Before the first part CRLFs are
+            # ignored preamble; afterwards the last frame is sent again.
+            if sent_jpeg is None:
+                last_write = time.monotonic()
+                yield _MJPEG_TRAIL
+                continue
+        else:
+            continue
+        
+        # Send the constant framing and the JPEG as separate chunks
+        # instead of concatenating them into a new bytes object
+        last_write = time.monotonic()
+        yield _MJPEG_HEADER
+        yield sent_jpeg
+        yield _MJPEG_TRAIL
 
 # Routes
 @app.route('/')
@@ -480,7 +840,8 @@ def index():
 @app.route('/video_feed')
 def video_feed():
     return Response(generate_frames(),
-                    mimetype='multipart/x-mixed-replace; boundary=frame')
+                    mimetype='multipart/x-mixed-replace; boundary=frame',
+                    direct_passthrough=True)
 
 @app.route('/api/start_camera', methods=['POST'])
 def start_camera():
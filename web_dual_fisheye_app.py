@@ -5,67 +5,300 @@
 # Compatible with Python 3.7
 
 import os
+import re
 import time
+import json
+import logging
 import threading
+import queue
 import base64
 import io
+import functools
 import cv2
 import numpy as np
 from datetime import datetime
 from flask import Flask, render_template, Response, request, jsonify
 from dual_fisheye_camera import DualFisheyeCamera
 
+# simplejpeg is optional; without it preview frames are encoded with cv2.imencode
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+# PyTurboJPEG is the next choice (same setup as web_debug_fisheye.py)
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR, TJSAMP_420, TJFLAG_FASTDCT
+    turbo_jpeg = TurboJPEG()
+except Exception:  # ImportError, or libturbojpeg not found
+    turbo_jpeg = None
+
+# orjson is optional (and needs Flask 2.2+ JSON providers); without it the
+# stdlib json module is used
+try:
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+except ImportError:
+    orjson = None
+
+# waitress is optional; without it the Flask built-in server is used
+try:
+    from waitress import serve
+except ImportError:
+    serve = None
+
+# JPEG quality for the browser preview
+PREVIEW_JPEG_QUALITY = 80
+
+# MJPEG part header, preceded by the CRLF that closes the previous part
+_MJPEG_HEADER_FMT = b'\r\n--frame\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n'
+
+# Preview size. The camera delivers frames at this size and every client gets
+# the same JPEG (encoded once per frame); the page scales it with CSS instead
+# of requesting other sizes.
+PREVIEW_SIZE = (800, 400)
+
+# CPU affinity on a 4-core Pi: the preview encoder gets the last core to
+# itself and the server and camera threads share the others
+_CPU_COUNT = os.cpu_count() or 1
+ENCODER_CPUS = {_CPU_COUNT - 1}
+SERVER_CPUS = set(range(_CPU_COUNT - 1))
+
+# Every open preview or status stream holds a server worker thread for as
+# long as it is connected (two per page). Streams are capped so that the API
+# requests always have workers left.
+MAX_STREAMS = 8
+SERVER_THREADS = MAX_STREAMS + 4
+_stream_slots = threading.BoundedSemaphore(MAX_STREAMS)
+
+# Idle streams write at least this often (seconds), so the server notices
+# clients that have gone away and frees their worker
+STREAM_KEEPALIVE = 5.0
+
 # Global variables
 camera = None
 recording = False
 preview_thread = None
+encode_thread = None
 stop_preview = False
-last_frame = None
-frame_lock = threading.Lock()
+# Newest preview frame waiting for the encoder thread (older ones are dropped)
+raw_q = queue.Queue(maxsize=1)
+# Latest preview JPEG as a single (sequence, jpeg, part header) slot. The tuple
+# is replaced with one reference store, so readers never need a lock to take a snapshot.
+last_frame_ref = [(0, None, None)]
+# Writers (encoder thread and the hardware-JPEG path) take sequence numbers under this lock
+_publish_lock = threading.Lock()
+frame_cond = threading.Condition()  # Only used to wake readers waiting for a new frame
+# Number of connected /video_feed clients; encode_needed is set while there is at least one
+active_clients = 0
+_clients_lock = threading.Lock()
+encode_needed = threading.Event()
+# Serializes the API handlers that change camera state
+_camera_lock = threading.Lock()
+# Bumped by the API handlers whenever camera/recording/display state changes
+status_cond = threading.Condition()
+status_seq = 0
 
 # Create Flask app
 app = Flask(__name__)
 
-# Create templates directory if it doesn't exist
-os.makedirs('templates', exist_ok=True)
+if orjson is not None:
+    class OrjsonProvider(DefaultJSONProvider):
+        """Flask JSON provider that serializes with orjson"""
+        
+        def dumps(self, obj, **kwargs):
+            option = orjson.OPT_SORT_KEYS if kwargs.get('sort_keys', self.sort_keys) else 0
+            if kwargs.get('indent'):
+                option |= orjson.OPT_INDENT_2
+            return orjson.dumps(obj, default=self.default, option=option).decode()
+        
+        def loads(self, s, **kwargs):
+            return orjson.loads(s)
+    
+    app.json = OrjsonProvider(app)
+
+def dumps_json(obj):
+    """Serialize obj to a JSON string, with orjson when available"""
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj)
 
 # Function to convert OpenCV frame to jpeg
 def convert_frame_to_jpeg(frame):
     if frame is None:
         return None
     
-    # Resize for preview if needed
-    frame = cv2.resize(frame, (800, 400))
+    # Convert to jpeg (simplejpeg and PyTurboJPEG wrap libjpeg-turbo and return bytes directly)
+    if simplejpeg is not None:
+        return simplejpeg.encode_jpeg(frame, quality=PREVIEW_JPEG_QUALITY, colorspace='BGR', fastdct=True)
     
-    # Convert to jpeg
-    _, buffer = cv2.imencode('.jpg', frame)
+    if turbo_jpeg is not None:
+        return turbo_jpeg.encode(frame, quality=PREVIEW_JPEG_QUALITY, pixel_format=TJPF_BGR,
+                                 jpeg_subsample=TJSAMP_420, flags=TJFLAG_FASTDCT)
+    
+    _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, PREVIEW_JPEG_QUALITY])
     return buffer.tobytes()
 
 # Preview update thread
 def update_preview():
-    global stop_preview, last_frame
+    global stop_preview
+    
+    # Captured frame and display mode behind the current JPEG
+    last_source = None
+    last_mode = None
+    
+    # Loop invariants, looked up once instead of on every frame
+    use_hw_jpeg = camera.config.get('preview_hw_jpeg', False)
+    wait_for_client = encode_needed.wait
     
     while not stop_preview:
+        # Nobody is watching the preview: don't fetch or encode frames
+        if not wait_for_client(timeout=0.5):
+            continue
+        
         if camera and camera.running:
-            frame = camera.get_preview_frame()
-            
-            if frame is not None:
-                with frame_lock:
-                    last_frame = convert_frame_to_jpeg(frame)
+            # The capture loop stores a new array for every frame, so the same
+            # object means nothing new to resize and encode
+            source = camera.frame
+            mode = camera.display_mode
+            if source is not None and (source is not last_source or mode != last_mode):
+                if use_hw_jpeg and mode != 'equirectangular':
+                    # The camera's hardware encoder already produced a JPEG of
+                    # the raw fisheye frame; stream it without a CPU encode
+                    publish_jpeg(camera.frame_jpeg)
+                    frame = None
+                else:
+                    # Ask for the preview size directly so the frame is resized once
+                    frame = camera.get_preview_frame(PREVIEW_SIZE)
+                
+                if frame is not None:
+                    # Hand over to the encoder, replacing a frame it has not
+                    # picked up yet so it always encodes the newest one
+                    try:
+                        raw_q.get_nowait()
+                    except queue.Empty:
+                        pass
+                    raw_q.put_nowait(frame)
+                last_source = source
+                last_mode = mode
+                
+                time.sleep(0.1)  # Update at ~10 FPS to reduce CPU load
+            else:
+                # Nothing new yet: sleep until the capture loop delivers a frame
+                with camera.frame_cond:
+                    camera.frame_cond.wait(timeout=0.5)
+        else:
+            time.sleep(0.1)
+
+def set_thread_affinity(cpus, niceness=0):
+    """Pin the calling thread to cpus (Linux only, skipped below 4 cores)"""
+    if not hasattr(os, 'sched_setaffinity') or _CPU_COUNT < 4:
+        return
+    
+    try:
+        # pid 0 is the calling thread, so Thread.native_id (Python 3.8+) is not needed
+        os.sched_setaffinity(0, cpus)
+        if niceness and os.geteuid() == 0:
+            os.nice(niceness)
+    except OSError as e:
+        logging.getLogger('WebDualFisheyeApp').warning(f"Could not set CPU affinity: {str(e)}")
+
+# Preview encoder thread
+def encode_preview():
+    # Keep the encoder on its own core so its working set stays in that core's cache
+    set_thread_affinity(ENCODER_CPUS, niceness=-5)
+    
+    get_frame = raw_q.get
+    while not stop_preview:
+        try:
+            frame = get_frame(timeout=0.5)
+        except queue.Empty:
+            continue
         
-        time.sleep(0.1)  # Update at ~10 FPS to reduce CPU load
+        publish_jpeg(convert_frame_to_jpeg(frame))
+
+def publish_jpeg(jpeg):
+    """Make jpeg the latest preview frame and wake the streaming clients"""
+    # The part header depends only on the JPEG, so build it once for all clients
+    header = _MJPEG_HEADER_FMT % len(jpeg) if jpeg is not None else None
+    with _publish_lock:
+        last_frame_ref[0] = (last_frame_ref[0][0] + 1, jpeg, header)
+    with frame_cond:
+        frame_cond.notify_all()
 
 # Generate camera frames for streaming
 def generate_frames():
-    global last_frame
+    global active_clients
     
-    while True:
-        with frame_lock:
-            if last_frame is not None:
-                yield (b'--frame\r\n'
-                       b'Content-Type: image/jpeg\r\n\r\n' + last_frame + b'\r\n')
-        
-        time.sleep(0.1)
+    with _clients_lock:
+        active_clients += 1
+        encode_needed.set()
+    
+    try:
+        seen_seq = 0
+        first_part = True
+        last_write = time.monotonic()
+        while True:
+            seq, jpeg, header = last_frame_ref[0]
+            if seq == seen_seq:
+                # Already sent: sleep until encode_preview publishes a new frame.
+                # A slow client simply skips the frames published meanwhile.
+                with frame_cond:
+                    frame_cond.wait_for(lambda: last_frame_ref[0][0] != seen_seq, timeout=1.0)
+                
+                if last_frame_ref[0][0] == seen_seq and time.monotonic() - last_write >= STREAM_KEEPALIVE:
+                    # No new frame (camera stopped): write anyway so a closed
+                    # connection is detected. Before the first part CRLFs are
+                    # ignored preamble; afterwards the last frame is sent again.
+                    last_write = time.monotonic()
+                    if first_part or jpeg is None:
+                        yield b'\r\n'
+                    else:
+                        yield header
+                        yield jpeg
+                continue
+            seen_seq = seq
+            
+            if jpeg is not None:
+                # Header and JPEG as separate chunks so the JPEG bytes are never
+                # copied into a combined buffer: two socket writes per frame.
+                # The CRLF that ends a part is sent with the next part's header.
+                if first_part:
+                    yield header[2:]
+                    first_part = False
+                else:
+                    yield header
+                yield jpeg
+                last_write = time.monotonic()
+    finally:
+        with _clients_lock:
+            active_clients -= 1
+            if active_clients == 0:
+                encode_needed.clear()
+
+def camera_action(handler):
+    """Run a state-changing API handler under _camera_lock, rejecting it while another one runs"""
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        # Reject instead of queueing so repeated taps don't pile up behind a slow camera call
+        if not _camera_lock.acquire(blocking=False):
+            return jsonify({"status": "error", "message": "他の操作を実行中です"})
+        try:
+            return handler(*args, **kwargs)
+        finally:
+            _camera_lock.release()
+    return wrapper
+
+def stream_response(generator, **kwargs):
+    """Response for a long-lived stream, or 503 when all stream slots are taken"""
+    if not _stream_slots.acquire(blocking=False):
+        generator.close()
+        return Response("Too many open streams", status=503)
+    
+    response = Response(generator, **kwargs)
+    # Runs when the server closes the response, even if it never started iterating
+    response.call_on_close(_stream_slots.release)
+    return response
 
 # Routes
 @app.route('/')
@@ -74,12 +307,13 @@ def index():
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(),
-                    mimetype='multipart/x-mixed-replace; boundary=frame')
+    return stream_response(generate_frames(),
+                           mimetype='multipart/x-mixed-replace; boundary=frame')
 
 @app.route('/api/start_camera', methods=['POST'])
+@camera_action
 def start_camera():
-    global camera, preview_thread, stop_preview
+    global camera, preview_thread, encode_thread, stop_preview
     
     if camera is None:
         camera = DualFisheyeCamera()
@@ -88,12 +322,16 @@ def start_camera():
         if camera.open():
             camera.start()
             
-            # Start preview thread
+            # Start preview threads (frame fetch and JPEG encode run in parallel)
             stop_preview = False
             preview_thread = threading.Thread(target=update_preview)
             preview_thread.daemon = True
             preview_thread.start()
+            encode_thread = threading.Thread(target=encode_preview)
+            encode_thread.daemon = True
+            encode_thread.start()
             
+            notify_status()
             return jsonify({"status": "success", "message": "カメラを起動しました"})
         else:
             return jsonify({"status": "error", "message": "カメラの初期化に失敗しました"})
@@ -101,6 +339,7 @@ def start_camera():
         return jsonify({"status": "info", "message": "カメラは既に起動しています"})
 
 @app.route('/api/stop_camera', methods=['POST'])
+@camera_action
 def stop_camera():
     global camera, stop_preview, recording
     
@@ -110,19 +349,23 @@ def stop_camera():
             camera.stop_recording()
             recording = False
         
-        # Stop preview thread
+        # Stop preview threads
         stop_preview = True
         if preview_thread:
             preview_thread.join(timeout=1.0)
+        if encode_thread:
+            encode_thread.join(timeout=1.0)
         
         # Stop camera
         camera.stop()
         
+        notify_status()
         return jsonify({"status": "success", "message": "カメラを停止しました"})
     else:
         return jsonify({"status": "info", "message": "カメラは既に停止しています"})
 
 @app.route('/api/toggle_recording', methods=['POST'])
+@camera_action
 def toggle_recording():
     global camera, recording
     
@@ -131,17 +374,20 @@ def toggle_recording():
             # Start recording
             camera.start_recording()
             recording = True
+            notify_status()
             return jsonify({"status": "success", "message": "録画を開始しました", "recording": True})
         else:
             # Stop recording
             camera.stop_recording()
             recording = False
+            notify_status()
             video_path = camera.current_video_path if camera.current_video_path else "不明"
             return jsonify({"status": "success", "message": f"録画を停止しました: {video_path}", "recording": False})
     else:
         return jsonify({"status": "error", "message": "カメラが起動していません"})
 
 @app.route('/api/capture_photo', methods=['POST'])
+@camera_action
 def capture_photo():
     global camera
     
@@ -156,11 +402,13 @@ def capture_photo():
         return jsonify({"status": "error", "message": "カメラが起動していません"})
 
 @app.route('/api/toggle_display_mode', methods=['POST'])
+@camera_action
 def toggle_display_mode():
     global camera
     
     if camera and camera.running:
         new_mode = camera.toggle_display_mode()
+        notify_status()
         mode_names = {
             'fisheye': 'デュアルフィッシュアイ',
             'equirectangular': '全天球展開'
@@ -171,10 +419,8 @@ def toggle_display_mode():
     else:
         return jsonify({"status": "error", "message": "カメラが起動していません"})
 
-@app.route('/api/status', methods=['GET'])
-def get_status():
-    global camera, recording
-    
+def get_status_state():
+    """Collect the camera, recording and display mode state shown in the page"""
     camera_status = "running" if camera and camera.running else "stopped"
     recording_status = recording
     
@@ -183,290 +429,76 @@ def get_status():
     else:
         display_mode = "equirectangular"
     
-    return jsonify({
+    return {
         "camera": camera_status,
         "recording": recording_status,
         "display_mode": display_mode
-    })
-
-# Create HTML template
-html_template = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>360° デュアルフィッシュアイカメラコントロール</title>
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <style>
-        body {
-            font-family: Arial, sans-serif;
-            margin: 0;
-            padding: 20px;
-            background-color: #f5f5f5;
-            color: #333;
-        }
-        .container {
-            max-width: 1000px;
-            margin: 0 auto;
-        }
-        h1 {
-            text-align: center;
-            margin-bottom: 20px;
-        }
-        .status {
-            display: flex;
-            margin-bottom: 10px;
-        }
-        .status-item {
-            margin-right: 20px;
-            padding: 5px;
-            border-radius: 4px;
-        }
-        .preview {
-            border: 2px solid #444;
-            border-radius: 8px;
-            background-color: #000;
-            padding: 10px;
-            text-align: center;
-            margin-bottom: 20px;
-        }
-        .preview img {
-            max-width: 100%;
-            height: auto;
-            border-radius: 4px;
-        }
-        .controls {
-            display: flex;
-            flex-wrap: wrap;
-            justify-content: center;
-            gap: 10px;
-            margin-bottom: 20px;
-        }
-        button {
-            padding: 10px 15px;
-            border: none;
-            border-radius: 4px;
-            cursor: pointer;
-            font-weight: bold;
-            min-width: 120px;
-        }
-        .btn-start {
-            background-color: #4CAF50;
-            color: white;
-        }
-        .btn-stop {
-            background-color: #f44336;
-            color: white;
-        }
-        .btn-record {
-            background-color: #f44336;
-            color: white;
-        }
-        .btn-photo {
-            background-color: #2196F3;
-            color: white;
-        }
-        .btn-mode {
-            background-color: #9C27B0;
-            color: white;
-        }
-        .status-box {
-            margin-top: 20px;
-            border: 1px solid #ddd;
-            padding: 10px;
-            border-radius: 4px;
-            background-color: #fff;
-        }
-        .notification {
-            position: fixed;
-            bottom: 20px;
-            right: 20px;
-            padding: 10px 20px;
-            background-color: #333;
-            color: white;
-            border-radius: 4px;
-            display: none;
-            max-width: 300px;
-        }
-        .disabled {
-            opacity: 0.5;
-            cursor: not-allowed;
-        }
-        @media (max-width: 600px) {
-            .controls {
-                flex-direction: column;
-            }
-            button {
-                width: 100%;
-            }
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>360° デュアルフィッシュアイカメラコントロール</h1>
-        
-        <div class="status">
-            <div class="status-item" id="camera-status">カメラ: 停止中</div>
-            <div class="status-item" id="recording-status">録画: 停止中</div>
-        </div>
-        
-        <div class="preview">
-            <img id="camera-preview" src="/video_feed" alt="カメラプレビュー">
-        </div>
-        
-        <div class="controls">
-            <button id="btn-start-camera" class="btn-start">カメラ起動</button>
-            <button id="btn-stop-camera" class="btn-stop" disabled>カメラ停止</button>
-            <button id="btn-toggle-recording" class="btn-record" disabled>録画開始</button>
-            <button id="btn-capture-photo" class="btn-photo" disabled>写真撮影</button>
-            <button id="btn-toggle-mode" class="btn-mode" disabled>表示モード: 全天球展開</button>
-        </div>
-        
-        <div class="status-box">
-            <h3>ステータス:</h3>
-            <p>- このウェブアプリからデュアルフィッシュアイカメラを制御できます</p>
-            <p>- 全天球展開モードでは、デュアルフィッシュアイ画像がリアルタイムに展開されます</p>
-            <p>- 録画したビデオは自動的にMP4に変換されます</p>
-            <p>- '表示モード'ボタンで表示形式を切り替えられます</p>
-        </div>
-    </div>
+    }
+
+def notify_status():
+    """Wake status stream clients after a state change"""
+    global status_seq
     
-    <div class="notification" id="notification"></div>
+    with status_cond:
+        status_seq += 1
+        status_cond.notify_all()
+
+# Generate server-sent status events, pushed only when the state changes
+def generate_status():
+    last_state = None
+    seen_seq = -1
+    while True:
+        with status_cond:
+            status_cond.wait_for(lambda: status_seq != seen_seq, timeout=STREAM_KEEPALIVE)
+            seen_seq = status_seq
+        
+        state = get_status_state()
+        if state != last_state:
+            last_state = state
+            yield f"data: {dumps_json(state)}\n\n"
+        else:
+            # Comment line keeps idle connections open and detects closed ones
+            yield ": keepalive\n\n"
+
+@app.route('/api/status', methods=['GET'])
+def get_status():
+    return jsonify(get_status_state())
+
+@app.route('/api/status_stream')
+def status_stream():
+    return stream_response(generate_status(), mimetype='text/event-stream',
+                           headers={'Cache-Control': 'no-cache'})
+
+def check_jpeg_backend():
+    """Warn when preview encoding falls back to an OpenCV build linked against IJG libjpeg 9"""
+    if simplejpeg is not None or turbo_jpeg is not None:
+        return
     
-    <script>
-        document.addEventListener('DOMContentLoaded', function() {
-            // Elements
-            const cameraStatus = document.getElementById('camera-status');
-            const recordingStatus = document.getElementById('recording-status');
-            const startButton = document.getElementById('btn-start-camera');
-            const stopButton = document.getElementById('btn-stop-camera');
-            const recordButton = document.getElementById('btn-toggle-recording');
-            const photoButton = document.getElementById('btn-capture-photo');
-            const modeButton = document.getElementById('btn-toggle-mode');
-            const notification = document.getElementById('notification');
-            
-            // Display modes
-            const displayModes = {
-                'fisheye': 'デュアルフィッシュアイ',
-                'equirectangular': '全天球展開'
-            };
-            
-            // Update status
-            function updateStatus() {
-                fetch('/api/status')
-                    .then(response => response.json())
-                    .then(data => {
-                        // Update camera status
-                        if (data.camera === 'running') {
-                            cameraStatus.textContent = 'カメラ: 動作中';
-                            cameraStatus.style.color = 'green';
-                            startButton.disabled = true;
-                            stopButton.disabled = false;
-                            recordButton.disabled = false;
-                            photoButton.disabled = false;
-                            modeButton.disabled = false;
-                        } else {
-                            cameraStatus.textContent = 'カメラ: 停止中';
-                            cameraStatus.style.color = 'red';
-                            startButton.disabled = false;
-                            stopButton.disabled = true;
-                            recordButton.disabled = true;
-                            photoButton.disabled = true;
-                            modeButton.disabled = true;
-                        }
-                        
-                        // Update recording status
-                        if (data.recording) {
-                            recordingStatus.textContent = '録画: 録画中';
-                            recordingStatus.style.color = 'red';
-                            recordButton.textContent = '録画停止';
-                            recordButton.style.backgroundColor = '#2196F3';
-                        } else {
-                            recordingStatus.textContent = '録画: 停止中';
-                            recordingStatus.style.color = '';
-                            recordButton.textContent = '録画開始';
-                            recordButton.style.backgroundColor = '#f44336';
-                        }
-                        
-                        // Update display mode button
-                        const modeName = displayModes[data.display_mode] || data.display_mode;
-                        modeButton.textContent = `表示モード: ${modeName}`;
-                    })
-                    .catch(error => console.error('Status error:', error));
-            }
-            
-            // Show notification
-            function showNotification(message, timeout = 3000) {
-                notification.textContent = message;
-                notification.style.display = 'block';
-                
-                setTimeout(() => {
-                    notification.style.display = 'none';
-                }, timeout);
-            }
-            
-            // API request helper
-            function apiRequest(endpoint, successCallback) {
-                fetch(endpoint, {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json',
-                    }
-                })
-                .then(response => response.json())
-                .then(data => {
-                    showNotification(data.message);
-                    if (successCallback) successCallback(data);
-                    updateStatus();
-                })
-                .catch(error => {
-                    console.error('API error:', error);
-                    showNotification('エラーが発生しました', 5000);
-                });
-            }
-            
-            // Event listeners
-            startButton.addEventListener('click', function() {
-                apiRequest('/api/start_camera');
-            });
-            
-            stopButton.addEventListener('click', function() {
-                apiRequest('/api/stop_camera');
-            });
-            
-            recordButton.addEventListener('click', function() {
-                apiRequest('/api/toggle_recording');
-            });
-            
-            photoButton.addEventListener('click', function() {
-                apiRequest('/api/capture_photo');
-            });
-            
-            modeButton.addEventListener('click', function() {
-                apiRequest('/api/toggle_display_mode', function(data) {
-                    const modeName = displayModes[data.mode] || data.mode;
-                    modeButton.textContent = `表示モード: ${modeName}`;
-                });
-            });
-            
-            // Initial status update
-            updateStatus();
-            
-            // Periodic status updates
-            setInterval(updateStatus, 5000);
-        });
-    </script>
-</body>
-</html>
-"""
-
-# Write template file
-with open('templates/dual_fisheye_index.html', 'w') as f:
-    f.write(html_template)
+    # Debian/Raspberry Pi OS python3-opencv links the system libjpeg62-turbo but
+    # only reports "libjpeg.so (ver 62)", so go by the API version: libjpeg-turbo
+    # provides 62/70/80, only the slower IJG libjpeg 9 reports 90 and above
+    for line in cv2.getBuildInformation().splitlines():
+        if 'JPEG:' not in line or 'turbo' in line:
+            continue
+        match = re.search(r'ver (\d+)', line)
+        if match and int(match.group(1)) >= 90:
+            logging.getLogger('WebDualFisheyeApp').warning(
+                "OpenCV is built with libjpeg 9 instead of libjpeg-turbo; preview JPEG encoding will be slow. "
+                "Install simplejpeg, PyTurboJPEG or an OpenCV build linked against libjpeg62-turbo")
 
 # Main function
 def main():
-    app.run(host='0.0.0.0', port=8081, debug=True)
+    check_jpeg_backend()
+    # Threads started from here on inherit this mask; the encoder moves itself off it
+    set_thread_affinity(SERVER_CPUS)
+    
+    if serve is not None:
+        serve(app, host='0.0.0.0', port=8081, threads=SERVER_THREADS)
+    else:
+        # No reloader or debugger: they stat the sources and slow every request
+        logging.getLogger('WebDualFisheyeApp').warning(
+            "waitress is not installed; falling back to the Flask development server")
+        app.run(host='0.0.0.0', port=8081, debug=False, threaded=True)
 
 if __name__ == '__main__':
     main()